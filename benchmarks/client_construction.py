@@ -0,0 +1,40 @@
+"""Measures the cost of constructing feature store clients from the MLHUB_API_KEY.
+
+Compares resolving the feature server url on every construction, as before the
+resolver was memoized, with the cached resolution.
+
+    python benchmarks/client_construction.py
+"""
+import os
+import timeit
+
+import jwt
+
+from elemeno_ai_sdk.ml.features.feature_store import FeatureStore
+from elemeno_ai_sdk.ml.features.feature_table import FeatureTable
+from elemeno_ai_sdk.ml.features.utils import get_feature_server_url_from_api_key
+
+
+ITERATIONS = 20000
+
+
+def construct() -> None:
+    FeatureStore()
+    FeatureTable()
+
+
+def construct_uncached() -> None:
+    get_feature_server_url_from_api_key.cache_clear()
+    FeatureStore()
+    get_feature_server_url_from_api_key.cache_clear()
+    FeatureTable()
+
+
+if __name__ == "__main__":
+    os.environ["MLHUB_API_KEY"] = jwt.encode({"account": "bench.account@elemeno.ai"}, "secret", algorithm="HS256")
+
+    uncached = timeit.timeit(construct_uncached, number=ITERATIONS) / ITERATIONS
+    cached = timeit.timeit(construct, number=ITERATIONS) / ITERATIONS
+    print(f"uncached resolution: {uncached * 1e6:8.2f} us per FeatureStore + FeatureTable")
+    print(f"cached resolution:   {cached * 1e6:8.2f} us per FeatureStore + FeatureTable")
+    print(f"speedup:             {uncached / cached:8.2f}x")
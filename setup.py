@@ -74,6 +74,8 @@ setup(
         # eg:
         #   'rst': ['docutils>=0.11'],
         #   ':python_version=="2.6"': ['argparse'],
+        "fast": ["orjson>=3.9.10"],
+        "arrow": ["pyarrow>=14.0.1"],
     },
     entry_points={
         "console_scripts": [
@@ -6,8 +6,8 @@ from elemeno_ai_sdk.ml.mlhub_client import MLHubRemote
 
 class DataSource(MLHubRemote):
     
-    def __init__(self, env: Optional[str] = None) -> None:
-        super().__init__(env=env)
+    def __init__(self, env: Optional[str] = None, **kwargs) -> None:
+        super().__init__(env=env, **kwargs)
         self.url = f"{self.base_url}/datasource"
 
     async def list_sources(self):
@@ -20,8 +20,8 @@ import matplotlib.pyplot as plt
 
 
 class AutoMLClient(MLHubRemote):
-    def __init__(self, env: Optional[str] = None) -> None:
-        super().__init__(env=env)
+    def __init__(self, env: Optional[str] = None, **kwargs) -> None:
+        super().__init__(env=env, **kwargs)
 
     async def list_jobs(self) -> Dict[str, Any]:
         response = await self.get(url=f"{self.base_url}/automl")
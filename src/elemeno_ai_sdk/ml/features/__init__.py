@@ -1,3 +1,4 @@
 from elemeno_ai_sdk.ml.features.feature_store import FeatureStore
+from elemeno_ai_sdk.ml.features.writer import FeatureWriter
 
 # from elemeno_ai_sdk.ml.features.feature_table import FeatureTable
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+import pandas as pd
+
+from elemeno_ai_sdk.logger import logger
+from elemeno_ai_sdk.ml.features.payloads import import_pyarrow
+
+
+# Cache bounds
+MAX_CACHE_BYTES = 10 * 1024 * 1024 * 1024
+CACHE_TTL = 24 * 60 * 60
+
+# Prefix of the keys of entries holding a closed day, see FeatureCache.day_key
+DAY_KEY_PREFIX = "day-"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FeatureCache:
+    """An on-disk cache of training features, stored as one Parquet file per request.
+
+    Entries older than ``ttl`` seconds are ignored and removed. When the files
+    take more than ``max_bytes``, the least recently read ones are removed
+    first. The last read of an entry is kept as its file access time, and its
+    creation as its modification time. Requires pyarrow.
+
+    Entries keyed with ``day_key`` hold the features of a day that is over,
+    which don't change anymore, so they expire after ``day_ttl`` instead. By
+    default they're kept until evicted, so a daily rolling window only ever
+    fetches its newest day.
+
+    args:
+
+    - directory: Directory holding the cached files, created if it doesn't exist
+    - max_bytes: Maximum total size of the cached files
+    - ttl: Seconds an entry stays valid, None to keep entries until they're evicted
+    - day_ttl: Seconds an entry of a closed day stays valid, None to keep them until they're evicted
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        max_bytes: int = MAX_CACHE_BYTES,
+        ttl: Optional[float] = CACHE_TTL,
+        day_ttl: Optional[float] = None,
+    ):
+        import_pyarrow()
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.day_ttl = day_ttl
+        self.stats = CacheStats()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(*args: Any, **kwargs: Any) -> str:
+        """Builds the key of a request from its arguments."""
+        return hashlib.sha256(json.dumps([args, kwargs], sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def day_key(cls, *args: Any, **kwargs: Any) -> str:
+        """Builds the key of the features of a closed day from the request arguments, see ``day_ttl``."""
+        return DAY_KEY_PREFIX + cls.key(*args, **kwargs)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    def _expired(self, name: str, mtime: float, now: float) -> bool:
+        ttl = self.day_ttl if name.startswith(DAY_KEY_PREFIX) else self.ttl
+        return ttl is not None and now - mtime > ttl
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        now = time.time()
+        if self._expired(key, stat.st_mtime, now):
+            self.stats.expired += 1
+            self.stats.misses += 1
+            self._remove(path)
+            return None
+        try:
+            frame = pd.read_parquet(path)
+        except (OSError, ValueError):
+            logger.warning(f"Failed to read the cached features in {path}, fetching them again.", exc_info=True)
+            self.stats.misses += 1
+            self._remove(path)
+            return None
+        os.utime(path, (now, stat.st_mtime))
+        self.stats.hits += 1
+        return frame
+
+    def put(self, key: str, frame: pd.DataFrame) -> None:
+        path = self._path(key)
+        partial = f"{path}.{os.getpid()}.partial"
+        try:
+            frame.to_parquet(partial, index=False)
+        except (OSError, ValueError, TypeError):
+            # e.g. object columns mixing types Parquet can't represent
+            logger.warning("Failed to cache the training features.", exc_info=True)
+            self._remove(partial)
+            return
+        # the file only appears complete, so concurrent readers never see a partial one
+        os.replace(partial, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes expired entries, then the least recently read ones until the cache fits in ``max_bytes``."""
+        entries = []
+        now = time.time()
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".parquet"):
+                    continue
+                stat = entry.stat()
+                if self._expired(entry.name, stat.st_mtime, now):
+                    self._remove(entry.path)
+                    self.stats.expired += 1
+                else:
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            self.stats.evictions += 1
+            total -= size
+
+    def clear(self) -> None:
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(".parquet"):
+                    self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
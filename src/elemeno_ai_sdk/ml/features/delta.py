@@ -0,0 +1,88 @@
+import os
+import sqlite3
+from typing import List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+class RowHashIndex:
+    """A local SQLite index of the rows already ingested into each feature table.
+
+    Rows are identified by a hash of their ``keys`` columns, usually the table
+    entities and ``event_timestamp``, and the index keeps a hash of every column
+    of the last version ingested. Filtering data through ``changed_rows`` before
+    ingesting it then leaves only the rows that are new or whose values changed,
+    which is most of the savings when ingesting overlapping snapshots.
+
+    Only hashes are stored, 16 bytes per row plus SQLite overhead.
+
+    args:
+
+    - path: Path of the SQLite database, created if it doesn't exist
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = os.fspath(path)
+        # used from the thread of the event loop ingesting, e.g. the sync clients' background loop,
+        # which serializes every access
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS row_hashes ("
+            "feature_table TEXT NOT NULL, key_hash INTEGER NOT NULL, row_hash INTEGER NOT NULL, "
+            "PRIMARY KEY (feature_table, key_hash)) WITHOUT ROWID"
+        )
+        self._connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (key_hash INTEGER PRIMARY KEY)")
+        self._connection.commit()
+
+    @staticmethod
+    def hash_rows(frame: pd.DataFrame, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the key and row hashes of every row of ``frame``, as int64 to fit SQLite integers."""
+        key_hashes = pd.util.hash_pandas_object(frame[keys], index=False).values.view(np.int64)
+        row_hashes = pd.util.hash_pandas_object(frame, index=False).values.view(np.int64)
+        return key_hashes, row_hashes
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM row_hashes").fetchone()[0]
+
+    def changed_rows(self, feature_table_name: str, frame: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """Returns the rows of ``frame`` that aren't in the index with the same values."""
+        if frame.empty:
+            return frame
+        key_hashes, row_hashes = self.hash_rows(frame, keys)
+        self._connection.execute("DELETE FROM lookup")
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO lookup VALUES (?)", ((key_hash,) for key_hash in key_hashes.tolist())
+        )
+        stored = self._connection.execute(
+            "SELECT r.key_hash, r.row_hash FROM row_hashes r JOIN lookup l ON r.key_hash = l.key_hash "
+            "WHERE r.feature_table = ?",
+            (feature_table_name,),
+        ).fetchall()
+        if not stored:
+            return frame
+        stored_keys, stored_rows = np.array(stored, dtype=np.int64).T
+        positions = pd.Index(stored_keys).get_indexer(key_hashes)
+        changed = (positions < 0) | (stored_rows[positions] != row_hashes)
+        return frame[changed]
+
+    def record(self, feature_table_name: str, frame: pd.DataFrame, keys: List[str]) -> None:
+        """Records the rows of ``frame`` as ingested."""
+        key_hashes, row_hashes = self.hash_rows(frame, keys)
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO row_hashes VALUES (?, ?, ?)",
+            (
+                (feature_table_name, key_hash, row_hash)
+                for key_hash, row_hash in zip(key_hashes.tolist(), row_hashes.tolist())
+            ),
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "RowHashIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,18 +1,94 @@
 import asyncio
 import json
 import os
-from asyncio import Semaphore
-from typing import Dict, List, Optional
+import shutil
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import pandas as pd
-from tqdm import trange
+from tqdm import tqdm
 
+from elemeno_ai_sdk.logger import logger
+from elemeno_ai_sdk.ml.features.cache import FeatureCache
+from elemeno_ai_sdk.ml.features.delta import RowHashIndex
+from elemeno_ai_sdk.ml.features.feature_table import FeatureTable
+from elemeno_ai_sdk.ml.features.ingest import (
+    BATCH_SIZE,
+    CALIBRATION_ROWS,
+    CHUNK_ROWS,
+    INGEST_TARGETS,
+    MAX_CONCURRENT_BATCHES,
+    Batch,
+    BatchSizer,
+    FrameSource,
+    IngestReport,
+    aiter_batches,
+    aiter_frames,
+    count_file_rows,
+    iter_batches,
+    run_pipeline,
+)
+from elemeno_ai_sdk.ml.features.journal import IngestJournal
+from elemeno_ai_sdk.ml.features.payloads import (
+    CONTENT_TYPES,
+    PAYLOAD_FORMATS,
+    UNSUPPORTED_FORMAT_STATUSES,
+    encode_batch,
+    import_pyarrow,
+)
+from elemeno_ai_sdk.ml.features.pull import IncompletePullError, TrainingFeaturesPull
 from elemeno_ai_sdk.ml.features.utils import get_feature_server_url_from_api_key
-from elemeno_ai_sdk.ml.mlhub_client import MLHubRemote
+from elemeno_ai_sdk.ml.features.validation import (
+    EVENT_TIMESTAMP,
+    IngestValidationError,
+    apply_schema_dtypes,
+    validate_frame,
+)
+from elemeno_ai_sdk.ml.mlhub_client import MLHubRemote, is_transient_failure
+from elemeno_ai_sdk.ml.remote.concurrency import AdaptiveConcurrency
+from elemeno_ai_sdk.ml.remote.retry import MLHubRequestError
+
+
+# Historical features params
+PAGE_SIZE = 100
+MAX_PREFETCH = 10
+PAGE_RETRIES = 2
+SPILL_FORMATS = ("parquet", "arrow")
+
+
+def _utc_day(date: Union[str, pd.Timestamp]) -> pd.Timestamp:
+    """Returns the start of the day of ``date`` as a naive UTC timestamp."""
+    timestamp = pd.Timestamp(date)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.normalize()
 
 
 class FeatureStore(MLHubRemote):
-    def __init__(self, remote_server: Optional[str] = None):
+    """Client of the Elemeno feature store.
+
+    Pass a ``FeatureCache`` as ``cache`` to keep the results of
+    ``get_training_features`` on disk, so repeated requests are read locally.
+    See ``MLHubRemote`` for the other options.
+    """
+
+    def __init__(self, remote_server: Optional[str] = None, cache: Optional[FeatureCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
         if remote_server is None:
             api_key = os.getenv("MLHUB_API_KEY")
             if api_key is None:
@@ -20,6 +96,44 @@ class FeatureStore(MLHubRemote):
             self._remote_server = get_feature_server_url_from_api_key(api_key)
         else:
             self._remote_server = remote_server
+        # payload formats the feature server turned out not to support
+        self._unsupported_payload_formats: Set[str] = set()
+        # feature table definitions used to validate ingested data, by table name
+        self._table_schemas: Dict[str, Dict[str, Any]] = {}
+
+    async def warm_up(self, url: Optional[str] = None) -> None:
+        """Opens a pooled connection to the feature server, see ``MLHubRemote.warm_up``."""
+        await super().warm_up(url if url is not None else self._remote_server)
+
+    async def get_table_schema(self, feature_table_name: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Gets the definition of a feature table, with its entities and schema
+
+        Definitions are listed once with ``FeatureTable.list`` and cached, pass
+        ``refresh`` to list them again.
+
+        args:
+
+        - feature_table_name: Name of the feature table
+        - refresh: Whether to ignore the cached definitions
+
+        return:
+
+        - Dict with the table name, entities and schema
+        """
+        if refresh or feature_table_name not in self._table_schemas:
+            feature_table = FeatureTable(
+                remote_server=self._remote_server,
+                session=self.session,
+                retry_policy=self.retry_policy,
+                metrics=self.metrics,
+                serializer=self.serializer,
+            )
+            tables = await feature_table.list()
+            self._table_schemas.update({table["name"]: table for table in tables})
+        if feature_table_name not in self._table_schemas:
+            raise ValueError(f"Feature table {feature_table_name} doesn't exist.")
+        return self._table_schemas[feature_table_name]
 
     async def ingest(
         self,
@@ -27,36 +141,311 @@ class FeatureStore(MLHubRemote):
         to_ingest: pd.DataFrame,
         renames: Optional[Dict[str, str]] = None,
         all_columns: Optional[List[str]] = None,
-    ) -> None:
+        batch_size: Union[int, BatchSizer] = BATCH_SIZE,
+        max_concurrent_batches: int = MAX_CONCURRENT_BATCHES,
+        payload_format: str = "json",
+        journal: Optional[Union[str, os.PathLike, IngestJournal]] = None,
+        validate: bool = False,
+        row_index: Optional[Union[str, os.PathLike, RowHashIndex]] = None,
+        row_keys: Optional[List[str]] = None,
+        to: str = "online_and_offline",
+        show_progress: bool = True,
+        executor: Optional[Executor] = None,
+    ) -> IngestReport:
         """
         Ingests data into a feature table
 
+        The data is sent in batches of ``batch_size`` rows, with up to
+        ``max_concurrent_batches`` requests in flight. Pass a ``BatchSizer`` as
+        ``batch_size`` to size batches by their serialized payload instead, which
+        keeps requests of wide and narrow tables alike close to the same size.
+        A failed batch doesn't stop the ingestion, it's listed in the returned
+        report instead.
+
+        With ``payload_format`` set to arrow or parquet, batches are sent as Arrow
+        IPC streams or Parquet files built straight from the DataFrame columns,
+        which is much cheaper than building JSON lists. If the feature server
+        doesn't accept the format the batches are sent as JSON instead.
+
+        Pass a ``journal`` (an ``IngestJournal`` or the path of its file) to make
+        the ingestion resumable: every batch sent is recorded in it, and batches
+        already recorded are skipped, so rerunning a failed ingestion with the same
+        data and batch size only sends what's missing. Batches are matched by
+        content, so a journal needs a fixed ``batch_size``: the boundaries a
+        ``BatchSizer`` picks change between runs and would make it send rows again.
+
+        With ``validate`` set, the data is checked against the feature table schema
+        before anything is sent, and an ``IngestValidationError`` listing every
+        problem found is raised if it doesn't match.
+
+        Pass a ``row_index`` (a ``RowHashIndex`` or the path of its database) to
+        only send new or changed rows: rows are identified by their ``row_keys``
+        columns, by default the table entities and event_timestamp, and the index
+        remembers a hash of the values last sent for each of them. Batches then
+        hold fewer rows than ``batch_size`` when some of theirs are unchanged.
+
+        The data is written to the online and offline stores by default, set ``to``
+        to online or offline to write to only one of them.
+
+        Encoding batches holds the GIL, so with wide data a single core can't keep
+        up with the network. Pass a ``concurrent.futures.ProcessPoolExecutor`` as
+        ``executor`` to encode them in other processes, each batch being pickled
+        to its worker. Batches are encoded by the task sending them, so
+        ``max_concurrent_batches`` also bounds the number encoded at the same time.
+
         args:
 
         - feature_table: FeatureTable instance
         - to_ingest: Data to ingest
         - renames: Renames to apply to the data
         - all_columns: List of columns to ingest
+        - batch_size: Number of rows sent per request, or a BatchSizer
+        - max_concurrent_batches: Maximum number of batches being sent at the same time
+        - payload_format: json, arrow or parquet, the last two require pyarrow
+        - journal: IngestJournal, or its path, recording the batches already ingested
+        - validate: Whether to check the data against the feature table schema
+        - row_index: RowHashIndex, or its path, with the hashes of the rows already ingested
+        - row_keys: Columns identifying a row in the row index
+        - to: Stores to write to, online, offline or online_and_offline
+        - show_progress: Whether to show a progress bar
+        - executor: Executor encoding the batches, None to encode them in the event loop
 
         return:
 
-        - None
+        - IngestReport
         """
-        endpoint = f"{self._remote_server}/{feature_table_name}/push"
+        to_ingest = self._prepare_frame(to_ingest, renames, all_columns, batch_size, payload_format)
+        if validate:
+            await self._validate_frame(feature_table_name, to_ingest)
+        return await self._ingest_batches(
+            feature_table_name,
+            iter_batches(to_ingest, batch_size),
+            len(to_ingest),
+            batch_size,
+            max_concurrent_batches,
+            payload_format,
+            journal,
+            row_index,
+            row_keys,
+            to=to,
+            show_progress=show_progress,
+            executor=executor,
+        )
+
+    async def ingest_stream(
+        self,
+        feature_table_name: str,
+        source: FrameSource,
+        renames: Optional[Dict[str, str]] = None,
+        all_columns: Optional[List[str]] = None,
+        batch_size: Union[int, BatchSizer] = BATCH_SIZE,
+        max_concurrent_batches: int = MAX_CONCURRENT_BATCHES,
+        payload_format: str = "json",
+        chunk_rows: int = CHUNK_ROWS,
+        journal: Optional[Union[str, os.PathLike, IngestJournal]] = None,
+        validate: bool = False,
+        row_index: Optional[Union[str, os.PathLike, RowHashIndex]] = None,
+        row_keys: Optional[List[str]] = None,
+        to: str = "online_and_offline",
+        show_progress: bool = True,
+        executor: Optional[Executor] = None,
+    ) -> IngestReport:
+        """
+        Ingests data into a feature table without loading it all in memory
+
+        ``source`` can be an iterator or async iterator of DataFrames, or the path
+        of a CSV or Parquet file, which is read ``chunk_rows`` rows at a time. The
+        renames and column filter are applied to every chunk, and only the chunk
+        being sliced plus the batches in flight are kept in memory. Batches don't
+        span chunks, so chunks should hold many batches. When validating, each
+        chunk is checked before its batches are sent, so the batches of earlier
+        chunks may already be ingested when a bad chunk stops the ingestion. See
+        ``ingest`` for the other options.
+
+        args:
+
+        - feature_table: FeatureTable instance
+        - source: DataFrames to ingest, or the path of a CSV or Parquet file
+        - renames: Renames to apply to the data
+        - all_columns: List of columns to ingest
+        - batch_size: Number of rows sent per request, or a BatchSizer
+        - max_concurrent_batches: Maximum number of batches being sent at the same time
+        - payload_format: json, arrow or parquet, the last two require pyarrow
+        - chunk_rows: Number of rows read at a time from files
+        - journal: IngestJournal, or its path, recording the batches already ingested
+        - validate: Whether to check the data against the feature table schema
+        - row_index: RowHashIndex, or its path, with the hashes of the rows already ingested
+        - row_keys: Columns identifying a row in the row index
+        - to: Stores to write to, online, offline or online_and_offline
+        - show_progress: Whether to show a progress bar
+        - executor: Executor encoding the batches, None to encode them in the event loop
+
+        return:
 
+        - IngestReport
+        """
+        total_rows = count_file_rows(source) if isinstance(source, (str, os.PathLike)) else None
+
+        async def frames() -> AsyncIterator[pd.DataFrame]:
+            async for frame in aiter_frames(source, chunk_rows):
+                frame = self._prepare_frame(frame, renames, all_columns, batch_size, payload_format)
+                if validate:
+                    await self._validate_frame(feature_table_name, frame)
+                yield frame
+
+        return await self._ingest_batches(
+            feature_table_name,
+            aiter_batches(frames(), batch_size),
+            total_rows,
+            batch_size,
+            max_concurrent_batches,
+            payload_format,
+            journal,
+            row_index,
+            row_keys,
+            to=to,
+            show_progress=show_progress,
+            executor=executor,
+        )
+
+    def _prepare_frame(
+        self,
+        frame: pd.DataFrame,
+        renames: Optional[Dict[str, str]],
+        all_columns: Optional[List[str]],
+        batch_size: Union[int, BatchSizer],
+        payload_format: str,
+    ) -> pd.DataFrame:
         # adjust the column names
         if renames is not None:
-            to_ingest = to_ingest.rename(columns=renames)
+            frame = frame.rename(columns=renames)
 
         # filter the columns
         if all_columns is not None:
-            to_ingest = to_ingest[all_columns]
+            frame = frame[all_columns]
+
+        if isinstance(batch_size, BatchSizer) and batch_size.bytes_per_row is None:
+            batch_size.calibrate(
+                frame.iloc[:CALIBRATION_ROWS], lambda sample: self._encode_batch(sample, payload_format)
+            )
+        return frame
+
+    async def _validate_frame(self, feature_table_name: str, frame: pd.DataFrame) -> None:
+        table = await self.get_table_schema(feature_table_name)
+        errors = validate_frame(frame, table)
+        if errors:
+            raise IngestValidationError(feature_table_name, errors)
+
+    async def _ingest_batches(
+        self,
+        feature_table_name: str,
+        batches: Union[Iterable[Batch], AsyncIterable[Batch]],
+        total_rows: Optional[int],
+        batch_size: Union[int, BatchSizer],
+        max_concurrent_batches: int,
+        payload_format: str,
+        journal: Optional[Union[str, os.PathLike, IngestJournal]] = None,
+        row_index: Optional[Union[str, os.PathLike, RowHashIndex]] = None,
+        row_keys: Optional[List[str]] = None,
+        to: str = "online_and_offline",
+        show_progress: bool = True,
+        executor: Optional[Executor] = None,
+    ) -> IngestReport:
+        if payload_format not in PAYLOAD_FORMATS:
+            raise ValueError(
+                f"Invalid payload format {payload_format}. Please use one of {', '.join(PAYLOAD_FORMATS)}."
+            )
+        if to not in INGEST_TARGETS:
+            raise ValueError(f"Invalid target {to}. Please use one of {', '.join(INGEST_TARGETS)}.")
+        if journal is not None and isinstance(batch_size, BatchSizer):
+            raise ValueError("A journal can't be used with a BatchSizer, please pass a fixed batch_size.")
+        endpoint = f"{self._remote_server}/{feature_table_name}/push"
+        if row_index is not None and row_keys is None:
+            table = await self.get_table_schema(feature_table_name)
+            row_keys = list(table.get("entities", [])) + [EVENT_TIMESTAMP]
+        owns_journal = journal is not None and not isinstance(journal, IngestJournal)
+        if owns_journal:
+            journal = IngestJournal(journal)
+        owns_row_index = row_index is not None and not isinstance(row_index, RowHashIndex)
+        if owns_row_index:
+            row_index = RowHashIndex(row_index)
+
+        async def send(batch: Batch) -> int:
+            if journal is not None:
+                batch_hash = IngestJournal.batch_hash(batch.data)
+                if journal.is_committed(feature_table_name, batch_hash):
+                    return 0
+            data = batch.data
+            if row_index is not None:
+                data = row_index.changed_rows(feature_table_name, data, row_keys)
+            if len(data) > 0:
+                start = time.perf_counter()
+                nbytes = await self._push(endpoint, data, payload_format, to, executor)
+                if isinstance(batch_size, BatchSizer):
+                    batch_size.observe(len(data), nbytes, time.perf_counter() - start)
+                if row_index is not None:
+                    row_index.record(feature_table_name, data, row_keys)
+            if journal is not None:
+                journal.commit(feature_table_name, batch_hash, batch.start, batch.stop)
+            return len(data)
+
+        try:
+            with tqdm(total=total_rows, unit="rows", disable=not show_progress) as progress:
+                report = await run_pipeline(batches, send, max_concurrent_batches, progress)
+        finally:
+            if owns_journal:
+                journal.close()
+            if owns_row_index:
+                row_index.close()
+
+        if report.skipped_rows:
+            logger.info(f"Skipped {report.skipped_rows} rows already ingested into {feature_table_name}.")
 
-        # paginate the insertion, 500 rows of to_ingest at a time
-        for i in trange(0, len(to_ingest), 500):
-            data = to_ingest.iloc[i : i + 500].to_dict("list")
-            body = {"df": data, "to": "online_and_offline"}
-            await self.post(url=endpoint, body=body)
+        if not report.ok:
+            logger.error(
+                f"Failed to ingest {report.failed_rows} rows in {len(report.failed_batches)} batches "
+                f"into {feature_table_name}, see the returned report for details."
+            )
+        return report
+
+    def _encode_batch(self, data: pd.DataFrame, payload_format: str = "json", to: str = "online_and_offline") -> bytes:
+        return encode_batch(data, payload_format, to, self.serializer)
+
+    async def _encode_batch_in(
+        self, executor: Optional[Executor], data: pd.DataFrame, payload_format: str, to: str
+    ) -> bytes:
+        if executor is None:
+            return self._encode_batch(data, payload_format, to)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, encode_batch, data, payload_format, to, self.serializer)
+
+    async def _push(
+        self,
+        endpoint: str,
+        data: pd.DataFrame,
+        payload_format: str = "json",
+        to: str = "online_and_offline",
+        executor: Optional[Executor] = None,
+    ) -> int:
+        """Pushes a batch, falling back to JSON if the server rejects ``payload_format``, and returns its size."""
+        if payload_format != "json" and payload_format not in self._unsupported_payload_formats:
+            body = await self._encode_batch_in(executor, data, payload_format, to)
+            try:
+                await self.post(
+                    url=f"{endpoint}?to={to}",
+                    file=body,
+                    headers={"Content-Type": CONTENT_TYPES[payload_format]},
+                    raise_errors=True,
+                )
+                return len(body)
+            except MLHubRequestError as exc:
+                if exc.status not in UNSUPPORTED_FORMAT_STATUSES:
+                    raise
+                logger.warning(f"The feature server doesn't accept {payload_format} payloads, sending JSON instead.")
+                self._unsupported_payload_formats.add(payload_format)
+        body = await self._encode_batch_in(executor, data, "json", to)
+        await self.post(url=endpoint, body=body, raise_errors=True)
+        return len(body)
 
     async def get_training_features(
         self,
@@ -65,10 +454,33 @@ class FeatureStore(MLHubRemote):
         features: List[str] = None,
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
+        apply_schema: bool = False,
+        use_cache: bool = True,
+        cache_by_day: bool = False,
+        page_size: int = PAGE_SIZE,
+        concurrency: Optional[AdaptiveConcurrency] = None,
     ) -> pd.DataFrame:
         """
         Gets training features from a feature table
 
+        Every page is turned into a DataFrame as soon as it arrives, and the pages
+        are concatenated once at the end, so the rows are never all held as dicts.
+        With ``apply_schema`` set, the columns are converted to the dtypes of the
+        feature table schema, e.g. timestamps to datetimes and ints to nullable ints.
+        Use ``iter_training_features`` to process the pages as they arrive instead.
+
+        When the store has a ``cache``, results are read from it if the same
+        request was made before, and stored in it otherwise. Set ``use_cache`` to
+        False to always fetch from the feature server, the result is still cached.
+
+        With ``cache_by_day`` set, results are cached per day of event_timestamp
+        instead, and only the days missing from the cache are fetched, in one
+        request per run of consecutive days. Extending a window by a day then
+        only fetches that day. Both dates are then required and taken as whole
+        days: the result holds the rows of every day from ``date_from`` to
+        ``date_to``, both included. Days that aren't over yet aren't cached, and
+        the ones that are expire after the cache's ``day_ttl``, never by default.
+
         args:
 
         - feature_table: FeatureTable instance
@@ -76,46 +488,461 @@ class FeatureStore(MLHubRemote):
         - features: List of feature names to select
         - date_from: Start date
         - date_to: End date
+        - apply_schema: Whether to convert the columns to the dtypes of the feature table schema
+        - use_cache: Whether to read the result from the cache
+        - cache_by_day: Whether to cache the result by day and only fetch the missing days
+        - page_size: Number of rows per page, see ``iter_training_features``
+        - concurrency: AdaptiveConcurrency choosing the number of pages fetched at the same time
 
         return:
 
         - pd.DataFrame
         """
+        if cache_by_day:
+            return await self._get_training_features_by_day(
+                feature_table_name,
+                entities,
+                features,
+                date_from,
+                date_to,
+                apply_schema,
+                use_cache,
+                page_size,
+                concurrency,
+            )
+        if self.cache is not None:
+            key = FeatureCache.key(
+                self._remote_server, feature_table_name, entities, features, date_from, date_to, apply_schema
+            )
+            if use_cache:
+                cached = await asyncio.to_thread(self.cache.get, key)
+                if cached is not None:
+                    return cached
+        frame = await self._fetch_training_features(
+            feature_table_name, entities, features, date_from, date_to, apply_schema, page_size, concurrency
+        )
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, key, frame)
+        return frame
+
+    async def _fetch_training_features(
+        self,
+        feature_table_name: str,
+        entities: Optional[List[str]],
+        features: Optional[List[str]],
+        date_from: Optional[str],
+        date_to: Optional[str],
+        apply_schema: bool,
+        page_size: int = PAGE_SIZE,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+    ) -> pd.DataFrame:
+        pull = await self.pull_training_features(
+            feature_table_name,
+            entities,
+            features,
+            date_from,
+            date_to,
+            page_size,
+            concurrency=concurrency,
+            apply_schema=apply_schema,
+        )
+        if not pull.complete:
+            raise IncompletePullError(pull)
+        return pull.to_frame()
+
+    async def pull_training_features(
+        self,
+        feature_table_name: str,
+        entities: List[str] = None,
+        features: List[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        page_size: int = PAGE_SIZE,
+        prefetch: int = MAX_PREFETCH,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        apply_schema: bool = False,
+    ) -> TrainingFeaturesPull:
+        """
+        Downloads training features, keeping the pages fetched when others fail
+
+        Every page is fetched independently and retried on transient failures,
+        and a page that still fails is recorded in the returned pull instead of
+        discarding the others. Pass the pull to ``resume_training_features`` to
+        fetch the missing pages later, and call its ``to_frame`` once complete.
+        With a ``directory``, pages are written there as they arrive, and the
+        pull can be restored with ``TrainingFeaturesPull.load`` in another process.
+
+        args:
+
+        - feature_table: FeatureTable instance
+        - entities: List of entity names to select
+        - features: List of feature names to select
+        - date_from: Start date
+        - date_to: End date
+        - page_size: Number of rows per page
+        - prefetch: Maximum number of pages fetched at the same time
+        - concurrency: AdaptiveConcurrency choosing the number of pages fetched at the same time
+        - directory: Directory where the pages are persisted, None to keep them in memory
+        - apply_schema: Whether to convert the columns to the dtypes of the feature table schema
+
+        return:
 
+        - TrainingFeaturesPull
+        """
+        table = await self.get_table_schema(feature_table_name) if apply_schema else None
         endpoint = f"{self._remote_server}/{feature_table_name}/historical-features"
+        params = self._historical_params(entities, features, date_from, date_to)
+        pull = TrainingFeaturesPull(endpoint, params, page_size, directory, table)
+        return await self.resume_training_features(pull, prefetch, concurrency)
+
+    async def spill_training_features(
+        self,
+        feature_table_name: str,
+        path: Union[str, os.PathLike],
+        entities: List[str] = None,
+        features: List[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        file_format: str = "parquet",
+        apply_schema: bool = False,
+        page_size: int = PAGE_SIZE,
+        prefetch: int = MAX_PREFETCH,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+    ):
+        """
+        Writes training features to disk page by page and returns them as a lazy dataset
+
+        Only the pages being fetched are held in memory, so the result can be
+        much larger than RAM. With the parquet format, ``path`` is a directory
+        receiving one Parquet file per page. With the arrow format, ``path`` is
+        a single Arrow IPC file, memory mapped when read, converted from Parquet
+        pages first written to a ``.pages`` directory next to it. If some pages
+        fail, an ``IncompletePullError`` is raised, its pull being resumable from
+        the Parquet directory and then written with ``write_arrow``. Either way,
+        the returned ``pyarrow.dataset.Dataset`` reads nothing until it's
+        scanned, and its ``files`` can be handed to Dask or Polars. Set
+        ``apply_schema`` so every page has the table's dtypes, otherwise they're
+        inferred page by page and promoted to a common schema, see
+        ``TrainingFeaturesPull.schema``. Requires pyarrow.
+
+        args:
+
+        - feature_table: FeatureTable instance
+        - path: Directory of the Parquet files, or path of the Arrow IPC file
+        - entities: List of entity names to select
+        - features: List of feature names to select
+        - date_from: Start date
+        - date_to: End date
+        - file_format: parquet or arrow
+        - apply_schema: Whether to convert the columns to the dtypes of the feature table schema
+        - page_size: Number of rows per page
+        - prefetch: Maximum number of pages fetched at the same time
+        - concurrency: AdaptiveConcurrency choosing the number of pages fetched at the same time
+
+        return:
+
+        - pyarrow.dataset.Dataset
+        """
+        if file_format not in SPILL_FORMATS:
+            raise ValueError(f"Invalid file format {file_format}. Please use one of {', '.join(SPILL_FORMATS)}.")
+        import_pyarrow()
+        import pyarrow.dataset as ds
+        from pyarrow.fs import LocalFileSystem
+
+        # the Arrow file needs the schema of every page before its first write, so pages go to Parquet first
+        directory = path if file_format == "parquet" else f"{os.fspath(path)}.pages"
+        pull = await self.pull_training_features(
+            feature_table_name,
+            entities,
+            features,
+            date_from,
+            date_to,
+            page_size,
+            prefetch,
+            concurrency,
+            directory=directory,
+            apply_schema=apply_schema,
+        )
+        if not pull.complete:
+            raise IncompletePullError(pull)
+        if file_format == "parquet":
+            return pull.dataset()
+
+        pull.write_arrow(path)
+        shutil.rmtree(directory)
+        # the local file system reads files into memory unless told to map them
+        return ds.dataset(os.path.abspath(path), format="ipc", filesystem=LocalFileSystem(use_mmap=True))
+
+    async def resume_training_features(
+        self,
+        pull: TrainingFeaturesPull,
+        prefetch: int = MAX_PREFETCH,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+    ) -> TrainingFeaturesPull:
+        """
+        Fetches the pages a pull is missing, see ``pull_training_features``
+
+        args:
+
+        - pull: TrainingFeaturesPull to complete
+        - prefetch: Maximum number of pages fetched at the same time
+        - concurrency: AdaptiveConcurrency choosing the number of pages fetched at the same time
+
+        return:
+
+        - The same TrainingFeaturesPull
+        """
+        if concurrency is None:
+            concurrency = AdaptiveConcurrency(max_limit=prefetch)
+        params = {**pull.params, "page_size": pull.page_size}
+        if pull.total_pages is None:
+            try:
+                frame, total_pages = await self._fetch_page(pull.endpoint, {**params, "page": 1}, concurrency)
+            except Exception as exc:
+                pull.fail_page(1, exc)
+                logger.error(f"Failed to fetch the first page of {pull.endpoint}.")
+                return pull
+            pull.set_total_pages(total_pages)
+            pull.add_page(1, frame)
 
-        params = {"initial_date": date_from, "end_date": date_to}
+        missing = iter(pull.missing_pages)
+        tasks: Dict[asyncio.Future, int] = {}
+        try:
+            while True:
+                while len(tasks) < min(prefetch, concurrency.limit):
+                    page = next(missing, None)
+                    if page is None:
+                        break
+                    task = asyncio.ensure_future(self._fetch_page(pull.endpoint, {**params, "page": page}, concurrency))
+                    tasks[task] = page
+                if not tasks:
+                    break
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = tasks.pop(task)
+                    if task.exception() is not None:
+                        pull.fail_page(page, task.exception())
+                    else:
+                        pull.add_page(page, task.result()[0])
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if pull.failed_pages:
+            logger.error(
+                f"Failed to fetch {len(pull.failed_pages)} of {pull.total_pages} pages of {pull.endpoint}, "
+                "resume the pull to fetch them."
+            )
+        return pull
+
+    @staticmethod
+    def _historical_params(
+        entities: Optional[List[str]],
+        features: Optional[List[str]],
+        date_from: Optional[str],
+        date_to: Optional[str],
+    ) -> Dict[str, Any]:
+        params = {}
+        if date_from is not None:
+            params["initial_date"] = date_from
+        if date_to is not None:
+            params["end_date"] = date_to
         if entities is not None:
             params["entities"] = json.dumps(entities)
         if features is not None:
             params["feature_refs"] = json.dumps(features)
-        # request all pages, after the first request it will get all the other pages in parallel
-        response = await self._retrieve_pages_in_parallel(endpoint, params)
-        return pd.DataFrame([row for page in response for row in page])
-
-    async def _retrieve_pages_in_parallel(self, endpoint, params, page_size=100, max_concurrent_requests=10):
-        # Use aiohttp client session to make the first request and get total pages
-        params["page_size"] = page_size
-        params["page"] = 1
-        response = await self.get(endpoint, params)
-        total_pages = response["pagination"]["total_pages"]
-        # If there's only one page, return the response immediately
-        if total_pages == 1:
-            return [response["data"]]
-
-        # Create a semaphore to limit the number of concurrent requests
-        semaphore = Semaphore(max_concurrent_requests)
-
-        # Fetch all pages in parallel
-        tasks = [self._fetch_page(semaphore, endpoint, {**params, "page": page}) for page in range(2, total_pages + 1)]
-        pages = await asyncio.gather(*tasks)
-        pages = [page["data"] for page in pages]
-
-        return [response["data"]] + pages
-
-    async def _fetch_page(self, semaphore, url, params):
-        async with semaphore:
-            return await self.get(url, params)
+        return params
+
+    async def _get_training_features_by_day(
+        self,
+        feature_table_name: str,
+        entities: Optional[List[str]],
+        features: Optional[List[str]],
+        date_from: Optional[str],
+        date_to: Optional[str],
+        apply_schema: bool,
+        use_cache: bool,
+        page_size: int = PAGE_SIZE,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+    ) -> pd.DataFrame:
+        if self.cache is None:
+            raise ValueError("Caching by day requires the FeatureStore to have a cache.")
+        if date_from is None or date_to is None:
+            raise ValueError("Caching by day requires both date_from and date_to.")
+        days = pd.date_range(_utc_day(date_from), _utc_day(date_to), freq="D")
+        today = _utc_day(pd.Timestamp.now(tz="UTC"))
+        keys = {
+            day: FeatureCache.day_key(
+                self._remote_server, feature_table_name, entities, features, day.date().isoformat(), apply_schema
+            )
+            for day in days
+        }
+
+        frames: Dict[pd.Timestamp, pd.DataFrame] = {}
+        if use_cache:
+            for day in days:
+                if day < today:
+                    cached = await asyncio.to_thread(self.cache.get, keys[day])
+                    if cached is not None:
+                        frames[day] = cached
+
+        # fetch every run of consecutive missing days with one request
+        missing = [day for day in days if day not in frames]
+        windows: List[List[pd.Timestamp]] = []
+        for day in missing:
+            if windows and day - windows[-1][-1] == pd.Timedelta(days=1):
+                windows[-1].append(day)
+            else:
+                windows.append([day])
+        for window in windows:
+            end = window[-1] + pd.Timedelta(days=1)
+            frame = await self._fetch_training_features(
+                feature_table_name,
+                entities,
+                features,
+                window[0].date().isoformat(),
+                end.date().isoformat(),
+                apply_schema,
+                page_size,
+                concurrency,
+            )
+            # the rows are split by day, which also drops rows of the next day the end date may include
+            if EVENT_TIMESTAMP in frame.columns:
+                row_days = pd.to_datetime(frame[EVENT_TIMESTAMP], utc=True).dt.tz_localize(None).dt.normalize()
+                by_day = dict(tuple(frame.groupby(row_days.to_numpy(), sort=False)))
+            elif frame.empty:
+                by_day = {}
+            else:
+                raise ValueError(
+                    f"Caching by day requires the {EVENT_TIMESTAMP} column, "
+                    f"which the features of {feature_table_name} don't have."
+                )
+            for day in window:
+                part = by_day.get(day, frame.iloc[0:0]).reset_index(drop=True)
+                frames[day] = part
+                if day < today:
+                    await asyncio.to_thread(self.cache.put, keys[day], part)
+
+        parts = [frames[day] for day in days if len(frames[day]) > 0]
+        if not parts:
+            return frames[days[0]] if len(days) > 0 else pd.DataFrame()
+        return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+    async def iter_training_features(
+        self,
+        feature_table_name: str,
+        entities: List[str] = None,
+        features: List[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        apply_schema: bool = False,
+        prefetch: int = MAX_PREFETCH,
+        pages_per_frame: int = 1,
+        page_size: int = PAGE_SIZE,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Iterates over the training features of a feature table, page by page
+
+        Pages are yielded in order as soon as they're available, while up to
+        ``prefetch`` of the next pages are downloaded in the background. At most
+        ``prefetch`` pages are held besides the one being consumed, however
+        large the date range. Set ``pages_per_frame`` to receive several pages
+        concatenated in one DataFrame.
+
+        The number of pages fetched at the same time is chosen by ``concurrency``,
+        which grows it while latency stays flat and cuts it down on failures and
+        latency spikes, within ``prefetch``. Pass an ``AdaptiveConcurrency`` with
+        equal bounds for a fixed number. Larger pages make fewer requests.
+
+        args:
+
+        - feature_table: FeatureTable instance
+        - entities: List of entity names to select
+        - features: List of feature names to select
+        - date_from: Start date
+        - date_to: End date
+        - apply_schema: Whether to convert the columns to the dtypes of the feature table schema
+        - prefetch: Maximum number of pages downloaded ahead of the one being consumed
+        - pages_per_frame: Number of pages in each yielded DataFrame
+        - page_size: Number of rows per page
+        - concurrency: AdaptiveConcurrency choosing the number of pages fetched at the same time
+
+        return:
+
+        - AsyncIterator[pd.DataFrame]
+        """
+        table = await self.get_table_schema(feature_table_name) if apply_schema else None
+        endpoint = f"{self._remote_server}/{feature_table_name}/historical-features"
+
+        params = self._historical_params(entities, features, date_from, date_to)
+
+        if concurrency is None:
+            concurrency = AdaptiveConcurrency(max_limit=prefetch)
+        pages = self._iter_pages(endpoint, params, page_size, prefetch, concurrency)
+        try:
+            buffered = []
+            async for page in pages:
+                buffered.append(page)
+                if len(buffered) == pages_per_frame:
+                    frame = pd.concat(buffered, ignore_index=True) if len(buffered) > 1 else buffered[0]
+                    buffered = []
+                    yield apply_schema_dtypes(frame, table) if table is not None else frame
+            if buffered:
+                frame = pd.concat(buffered, ignore_index=True)
+                yield apply_schema_dtypes(frame, table) if table is not None else frame
+        finally:
+            # stops the prefetching when the consumer stops early
+            await pages.aclose()
+
+    async def _iter_pages(
+        self, endpoint: str, params: Dict[str, Any], page_size: int, prefetch: int, concurrency: AdaptiveConcurrency
+    ) -> AsyncIterator[pd.DataFrame]:
+        # the first request tells how many pages there are
+        params = {**params, "page_size": page_size}
+        first_page, total_pages = await self._fetch_page(endpoint, {**params, "page": 1}, concurrency)
+        yield first_page
+        del first_page
+
+        # the next pages are fetched ahead, in a window of at most prefetch pages
+        pending: Deque[asyncio.Future] = deque()
+        next_page = 2
+        try:
+            while pending or next_page <= total_pages:
+                while len(pending) < min(prefetch, concurrency.limit) and next_page <= total_pages:
+                    page_params = {**params, "page": next_page}
+                    pending.append(asyncio.ensure_future(self._fetch_page(endpoint, page_params, concurrency)))
+                    next_page += 1
+                page, _ = await pending.popleft()
+                yield page
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_page(
+        self, url: str, params: Dict[str, Any], concurrency: AdaptiveConcurrency, retries: int = PAGE_RETRIES
+    ) -> Tuple[pd.DataFrame, int]:
+        """Fetches a page and returns it with the total number of pages.
+
+        Transient failures are retried ``retries`` times on top of the retries of
+        the request itself, so a page only fails after the server kept failing
+        for a while.
+        """
+        for attempt in range(1, retries + 2):
+            start = time.perf_counter()
+            try:
+                response = await self.get(url, params, raise_errors=True)
+            except Exception as exc:
+                concurrency.observe(None, ok=False)
+                if attempt > retries or not is_transient_failure(exc):
+                    raise
+                logger.warning(f"Failed to fetch page {params.get('page')} of {url}, retrying.")
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+                continue
+            concurrency.observe(time.perf_counter() - start)
+            # the row dicts of the page can be freed as soon as it's columnar
+            return pd.DataFrame.from_records(response["data"]), response["pagination"]["total_pages"]
 
     async def get_online_features(self, feature_table_name: str, entities: Dict[str, List], features: List[str]):
         endpoint = f"{self._remote_server}/{feature_table_name}/online-features"
@@ -13,7 +13,8 @@ class FeatureTable(MLHubRemote):
     If you're looking to create a new feature table or read data look at ingest_schema of the class FeatureStore.
     """
 
-    def __init__(self, remote_server: Optional[str] = None):
+    def __init__(self, remote_server: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
         if remote_server is None:
             api_key = os.getenv("MLHUB_API_KEY")
             if api_key is None:
@@ -22,6 +23,10 @@ class FeatureTable(MLHubRemote):
         else:
             self._remote_server = remote_server
 
+    async def warm_up(self, url: Optional[str] = None) -> None:
+        """Opens a pooled connection to the feature server, see ``MLHubRemote.warm_up``."""
+        await super().warm_up(url if url is not None else self._remote_server)
+
     async def create(self, schema_path: str) -> None:
         endpoint = f"{self._remote_server}/feature-view"
 
@@ -0,0 +1,273 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+import pandas as pd
+from tqdm import tqdm
+
+from elemeno_ai_sdk.ml.features.payloads import import_pyarrow
+
+
+# Ingestion params
+BATCH_SIZE = 500
+MAX_CONCURRENT_BATCHES = 4
+INGEST_TARGETS = ("online", "offline", "online_and_offline")
+
+# Payload size based batching params
+TARGET_BATCH_BYTES = 1024 * 1024
+MAX_BATCH_ROWS = 50000
+CALIBRATION_ROWS = 200
+
+# Rows read at a time when streaming from files
+CHUNK_ROWS = 100000
+
+FrameSource = Union[str, os.PathLike, Iterable[pd.DataFrame], AsyncIterable[pd.DataFrame]]
+
+
+@dataclass
+class Batch:
+    """A slice of the data being ingested, ``start`` and ``stop`` are row positions in the whole ingestion."""
+
+    index: int
+    start: int
+    stop: int
+    data: pd.DataFrame
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+
+@dataclass
+class FailedBatch:
+    index: int
+    start: int
+    stop: int
+    error: str
+
+
+@dataclass
+class IngestReport:
+    """Outcome of an ingestion, batches that failed are listed in ``failed_batches``.
+
+    ``skipped_rows`` counts the rows left out because a journal or a row index
+    showed they were already ingested.
+    """
+
+    ingested_rows: int = 0
+    skipped_rows: int = 0
+    batches: int = 0
+    failed_batches: List[FailedBatch] = field(default_factory=list)
+
+    @property
+    def failed_rows(self) -> int:
+        return sum(batch.stop - batch.start for batch in self.failed_batches)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed_batches
+
+
+class BatchSizer:
+    """Chooses how many rows to put in a batch so its payload is close to ``target_bytes``.
+
+    The serialized size of a row is first estimated by encoding a sample of the
+    data, then refined with the size of every batch sent. When ``target_latency``
+    is set, ``target_bytes`` is also tuned so that requests take about that many
+    seconds, growing while the server answers faster and shrinking when it slows down.
+
+    args:
+
+    - target_bytes: Desired serialized size of a batch
+    - max_rows: Maximum number of rows in a batch
+    - min_rows: Minimum number of rows in a batch
+    - target_latency: Desired request latency in seconds, None to keep target_bytes fixed
+    - min_bytes: Lower bound for the tuned target_bytes
+    - max_bytes: Upper bound for the tuned target_bytes
+    """
+
+    def __init__(
+        self,
+        target_bytes: int = TARGET_BATCH_BYTES,
+        max_rows: int = MAX_BATCH_ROWS,
+        min_rows: int = 1,
+        target_latency: Optional[float] = None,
+        min_bytes: int = 64 * 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+    ):
+        self.target_bytes = target_bytes
+        self.max_rows = max_rows
+        self.min_rows = min_rows
+        self.target_latency = target_latency
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.bytes_per_row: Optional[float] = None
+
+    def calibrate(self, sample: pd.DataFrame, encode: Callable[[pd.DataFrame], bytes]) -> None:
+        if len(sample) > 0:
+            self.bytes_per_row = len(encode(sample)) / len(sample)
+
+    def observe(self, rows: int, nbytes: int, latency: Optional[float] = None) -> None:
+        """Updates the estimates with a batch of ``rows`` rows, ``nbytes`` long and sent in ``latency`` seconds."""
+        if rows <= 0:
+            return
+        if self.bytes_per_row is None:
+            self.bytes_per_row = nbytes / rows
+        else:
+            self.bytes_per_row = 0.7 * self.bytes_per_row + 0.3 * nbytes / rows
+        if self.target_latency is not None and latency:
+            # damped multiplicative step towards the size that would take target_latency
+            step = min(2.0, max(0.5, self.target_latency / latency)) ** 0.5
+            self.target_bytes = int(min(self.max_bytes, max(self.min_bytes, self.target_bytes * step)))
+
+    def batch_rows(self) -> int:
+        if not self.bytes_per_row:
+            return self.min_rows
+        return int(min(self.max_rows, max(self.min_rows, self.target_bytes // self.bytes_per_row)))
+
+
+def iter_batches(data: pd.DataFrame, batch_size: Union[int, BatchSizer] = BATCH_SIZE) -> Iterator[Batch]:
+    """Slices ``data`` into batches of ``batch_size`` rows, or of the size a ``BatchSizer`` chooses for each batch."""
+    index, start = 0, 0
+    while start < len(data):
+        rows = batch_size.batch_rows() if isinstance(batch_size, BatchSizer) else batch_size
+        stop = min(start + rows, len(data))
+        yield Batch(index=index, start=start, stop=stop, data=data.iloc[start:stop])
+        index, start = index + 1, stop
+
+
+def iter_file_chunks(path: Union[str, os.PathLike], chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Reads a CSV file in chunks, or a Parquet file batch by batch, of at most ``chunk_rows`` rows."""
+    name = os.fspath(path).lower()
+    if name.endswith((".csv", ".csv.gz", ".csv.zip", ".csv.bz2")):
+        with pd.read_csv(path, chunksize=chunk_rows) as reader:
+            yield from reader
+    elif name.endswith((".parquet", ".pq")):
+        import_pyarrow()
+        import pyarrow.parquet as pq
+
+        for record_batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield record_batch.to_pandas()
+    else:
+        raise ValueError(f"Can't stream {path}, only CSV and Parquet files are supported.")
+
+
+def count_file_rows(path: Union[str, os.PathLike]) -> Optional[int]:
+    """Returns the number of rows of a Parquet file from its metadata, None for other files."""
+    if not os.fspath(path).lower().endswith((".parquet", ".pq")):
+        return None
+    import_pyarrow()
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+async def aiter_frames(source: FrameSource, chunk_rows: int = CHUNK_ROWS) -> AsyncIterator[pd.DataFrame]:
+    """Iterates over the DataFrames of ``source``, reading files and sync iterators in a worker thread."""
+    if isinstance(source, (str, os.PathLike)):
+        source = iter_file_chunks(source, chunk_rows)
+    if hasattr(source, "__aiter__"):
+        async for frame in source:
+            yield frame
+        return
+    iterator = iter(source)
+    done = object()
+    while True:
+        frame = await asyncio.to_thread(next, iterator, done)
+        if frame is done:
+            return
+        yield frame
+
+
+async def aiter_batches(
+    frames: AsyncIterable[pd.DataFrame], batch_size: Union[int, BatchSizer] = BATCH_SIZE
+) -> AsyncIterator[Batch]:
+    """Slices every frame of ``frames`` into batches, numbered across the whole stream."""
+    index, offset = 0, 0
+    async for frame in frames:
+        for batch in iter_batches(frame, batch_size):
+            yield Batch(index=index, start=offset + batch.start, stop=offset + batch.stop, data=batch.data)
+            index += 1
+        offset += len(frame)
+
+
+class _OrderedProgress:
+    """Advances a progress bar only over the contiguous prefix of finished batches."""
+
+    def __init__(self, progress: Optional[tqdm]):
+        self.progress = progress
+        self._next_index = 0
+        self._finished: Dict[int, int] = {}
+
+    def finish(self, batch: Batch) -> None:
+        self._finished[batch.index] = len(batch)
+        while self._next_index in self._finished:
+            rows = self._finished.pop(self._next_index)
+            if self.progress is not None:
+                self.progress.update(rows)
+            self._next_index += 1
+
+
+async def run_pipeline(
+    batches: Union[Iterable[Batch], AsyncIterable[Batch]],
+    send: Callable[[Batch], Awaitable[Optional[int]]],
+    max_concurrent_batches: int = MAX_CONCURRENT_BATCHES,
+    progress: Optional[tqdm] = None,
+) -> IngestReport:
+    """Sends ``batches`` with at most ``max_concurrent_batches`` in flight.
+
+    Batches are only pulled from ``batches`` when a sender is free, so lazily
+    produced batches are never all held in memory. A failing batch is recorded
+    in the report and doesn't stop the others. ``send`` may return how many
+    rows of the batch it actually sent, the others are counted as skipped.
+    """
+    if max_concurrent_batches < 1:
+        raise ValueError(f"max_concurrent_batches must be at least 1, got {max_concurrent_batches}.")
+    report = IngestReport()
+    ordered_progress = _OrderedProgress(progress)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_concurrent_batches)
+
+    async def worker() -> None:
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            try:
+                sent = await send(batch)
+                sent = len(batch) if sent is None else sent
+                report.ingested_rows += sent
+                report.skipped_rows += len(batch) - sent
+            except Exception as exc:
+                report.failed_batches.append(FailedBatch(batch.index, batch.start, batch.stop, repr(exc)))
+            finally:
+                report.batches += 1
+                ordered_progress.finish(batch)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrent_batches)]
+    try:
+        if hasattr(batches, "__aiter__"):
+            async for batch in batches:
+                await queue.put(batch)
+        else:
+            for batch in batches:
+                await queue.put(batch)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+
+    report.failed_batches.sort(key=lambda batch: batch.index)
+    return report
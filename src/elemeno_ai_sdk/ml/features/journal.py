@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+from typing import Set, Tuple, Union
+
+import pandas as pd
+
+
+class IngestJournal:
+    """An append-only file recording the batches already ingested into each feature table.
+
+    Batches are identified by a hash of their content, so rerunning a failed
+    ingestion of the same data with the same fixed batch size skips every batch
+    the previous run committed. Batch boundaries must be the same in every run,
+    which rules out a ``BatchSizer``. Each committed batch is written as a JSON
+    line and flushed right away, which keeps the journal valid if the process dies.
+
+    args:
+
+    - path: Path of the journal file, created if it doesn't exist
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = os.fspath(path)
+        self._committed: Set[Tuple[str, str]] = set()
+        if os.path.exists(self.path):
+            with open(self.path, "r") as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # a line cut short by a crash while it was being written
+                        continue
+                    self._committed.add((entry["table"], entry["hash"]))
+        self._file = open(self.path, "a")
+
+    @staticmethod
+    def batch_hash(data: pd.DataFrame) -> str:
+        digest = hashlib.sha256(json.dumps([str(column) for column in data.columns]).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._committed)
+
+    def is_committed(self, table: str, batch_hash: str) -> bool:
+        return (table, batch_hash) in self._committed
+
+    def commit(self, table: str, batch_hash: str, start: int, stop: int) -> None:
+        self._file.write(json.dumps({"table": table, "hash": batch_hash, "start": start, "stop": stop}) + "\n")
+        self._file.flush()
+        self._committed.add((table, batch_hash))
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "IngestJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
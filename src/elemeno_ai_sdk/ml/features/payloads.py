@@ -0,0 +1,68 @@
+import io
+from typing import Optional
+
+import pandas as pd
+
+from elemeno_ai_sdk.ml.remote.serializers import JSONSerializer
+
+
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+PAYLOAD_FORMATS = ("json", "arrow", "parquet")
+CONTENT_TYPES = {"arrow": ARROW_CONTENT_TYPE, "parquet": PARQUET_CONTENT_TYPE}
+
+# Statuses a feature server answers with when it can't decode a payload format,
+# a 404 isn't one of them since it also means the feature table doesn't exist
+UNSUPPORTED_FORMAT_STATUSES = frozenset({405, 415})
+
+
+def import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is required for the arrow and parquet payload formats, "
+            "install it with `pip install elemeno-ai-sdk[arrow]`."
+        ) from exc
+    return pa
+
+
+def encode_arrow(data: pd.DataFrame) -> bytes:
+    """Encodes ``data`` as an Arrow IPC stream, numeric columns are converted without copies."""
+    pa = import_pyarrow()
+    record_batch = pa.RecordBatch.from_pandas(data, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, record_batch.schema) as writer:
+        writer.write_batch(record_batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_parquet(data: pd.DataFrame) -> bytes:
+    pa = import_pyarrow()
+    import pyarrow.parquet as pq
+
+    sink = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(data, preserve_index=False), sink)
+    return sink.getvalue()
+
+
+def encode_payload(data: pd.DataFrame, payload_format: str) -> bytes:
+    if payload_format == "arrow":
+        return encode_arrow(data)
+    if payload_format == "parquet":
+        return encode_parquet(data)
+    raise ValueError(f"Invalid payload format {payload_format}. Please use one of {', '.join(PAYLOAD_FORMATS)}.")
+
+
+def encode_batch(
+    data: pd.DataFrame,
+    payload_format: str = "json",
+    to: str = "online_and_offline",
+    serializer: Optional[JSONSerializer] = None,
+) -> bytes:
+    """Encodes a batch pushed to the feature server, it's a module function so it can run in a process pool."""
+    if payload_format == "json":
+        serializer = serializer if serializer is not None else JSONSerializer()
+        return serializer.dumps({"df": data.to_dict("list"), "to": to})
+    return encode_payload(data, payload_format)
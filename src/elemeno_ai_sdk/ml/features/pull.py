@@ -0,0 +1,220 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from elemeno_ai_sdk.ml.features.payloads import import_pyarrow
+from elemeno_ai_sdk.ml.features.validation import apply_schema_dtypes
+from elemeno_ai_sdk.ml.remote.retry import MLHubRequestError
+
+
+PULL_METADATA = "pull.json"
+
+
+class TrainingFeaturesPull:
+    """The state of a download of training features, which can be resumed after failures.
+
+    Pages are kept as they're fetched, and the pages that failed are listed in
+    ``failed_pages`` with their error. Pass the pull to
+    ``FeatureStore.resume_training_features`` to fetch only the missing pages.
+
+    With a ``directory``, each page is written there as a Parquet file instead
+    of being kept in memory, along with the request, so ``load`` can restore the
+    pull in another process. The files then form a Parquet dataset, see
+    ``dataset``. A new pull removes the pages another pull left in its
+    directory, so a directory only ever holds the pages of one request.
+    Persisting requires pyarrow.
+
+    args:
+
+    - endpoint: Url of the historical features endpoint
+    - params: Query params of the request, without the pagination
+    - page_size: Number of rows per page
+    - directory: Directory where pages are persisted, None to keep them in memory
+    - table: Feature table definition whose schema dtypes are applied to every page
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        page_size: int,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        table: Optional[Dict[str, Any]] = None,
+    ):
+        self.endpoint = endpoint
+        self.params = params
+        self.page_size = page_size
+        self.table = table
+        self.directory = os.fspath(directory) if directory is not None else None
+        self.total_pages: Optional[int] = None
+        self.failed_pages: Dict[int, str] = {}
+        self._pages: Dict[int, pd.DataFrame] = {}
+        self._stored_pages: List[int] = []
+        if self.directory is not None:
+            import_pyarrow()
+            os.makedirs(self.directory, exist_ok=True)
+            # removed before the metadata is replaced, so a crash in between can't pair them with this request
+            for page in self._pages_on_disk():
+                os.remove(self._page_path(page))
+            self._save_metadata()
+
+    @classmethod
+    def load(cls, directory: Union[str, os.PathLike]) -> "TrainingFeaturesPull":
+        """Restores a pull persisted in ``directory``, with the pages it had fetched."""
+        import_pyarrow()
+        with open(os.path.join(directory, PULL_METADATA), "r") as metadata_file:
+            metadata = json.load(metadata_file)
+        # created without a directory so the pages on disk aren't removed
+        pull = cls(metadata["endpoint"], metadata["params"], metadata["page_size"], table=metadata.get("table"))
+        pull.directory = os.fspath(directory)
+        pull.total_pages = metadata["total_pages"]
+        if pull.total_pages is not None:
+            pull._stored_pages = [page for page in pull._pages_on_disk() if page <= pull.total_pages]
+        return pull
+
+    def _page_path(self, page: int) -> str:
+        return os.path.join(self.directory, f"page-{page:08d}.parquet")
+
+    def _pages_on_disk(self) -> List[int]:
+        return sorted(
+            int(name[len("page-") : -len(".parquet")])
+            for name in os.listdir(self.directory)
+            if name.startswith("page-") and name.endswith(".parquet")
+        )
+
+    def _save_metadata(self) -> None:
+        metadata = {
+            "endpoint": self.endpoint,
+            "params": self.params,
+            "page_size": self.page_size,
+            "total_pages": self.total_pages,
+            "table": self.table,
+        }
+        with open(os.path.join(self.directory, PULL_METADATA), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+    def set_total_pages(self, total_pages: int) -> None:
+        self.total_pages = total_pages
+        if self.directory is not None:
+            self._save_metadata()
+
+    def add_page(self, page: int, frame: pd.DataFrame) -> None:
+        self.failed_pages.pop(page, None)
+        if self.table is not None:
+            frame = apply_schema_dtypes(frame, self.table)
+        if self.directory is None:
+            self._pages[page] = frame
+            return
+        path = self._page_path(page)
+        frame.to_parquet(f"{path}.partial", index=False)
+        os.replace(f"{path}.partial", path)
+        self._stored_pages.append(page)
+
+    def fail_page(self, page: int, error: BaseException) -> None:
+        self.failed_pages[page] = repr(error)
+
+    @property
+    def fetched_pages(self) -> List[int]:
+        return sorted(set(self._pages) | set(self._stored_pages))
+
+    @property
+    def missing_pages(self) -> List[int]:
+        if self.total_pages is None:
+            return [1]
+        fetched = set(self.fetched_pages)
+        return [page for page in range(1, self.total_pages + 1) if page not in fetched]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing_pages
+
+    def pages(self) -> List[pd.DataFrame]:
+        """Returns the fetched pages in order, reading the persisted ones from disk."""
+        return [
+            self._pages[page] if page in self._pages else pd.read_parquet(self._page_path(page))
+            for page in self.fetched_pages
+        ]
+
+    @property
+    def files(self) -> List[str]:
+        """The Parquet files of the persisted pages, in page order."""
+        return [self._page_path(page) for page in sorted(self._stored_pages)]
+
+    def _check_persisted(self) -> None:
+        if self.directory is None:
+            raise ValueError("Only pulls persisted in a directory can be read as a dataset.")
+        if not self.complete:
+            raise ValueError(f"The pull is missing {len(self.missing_pages)} pages, resume it first.")
+
+    def schema(self):
+        """Returns the Arrow schema common to the persisted pages, raises if they don't have the same columns.
+
+        Page dtypes are inferred page by page unless the table schema is
+        applied, so the types are promoted: a column that is all null in a page
+        takes its type in the others, and integers mixed with floats become floats.
+        """
+        self._check_persisted()
+        pa = import_pyarrow()
+        import pyarrow.parquet as pq
+
+        schemas = [pq.read_schema(path) for path in self.files]
+        columns = schemas[0].names
+        for page, schema in zip(self.fetched_pages, schemas):
+            if set(schema.names) != set(columns):
+                raise ValueError(
+                    f"Page {page} has the columns {', '.join(schema.names)}, "
+                    f"while page {self.fetched_pages[0]} has {', '.join(columns)}."
+                )
+        return pa.unify_schemas(schemas, promote_options="permissive")
+
+    def dataset(self):
+        """Returns the persisted pages as a lazy ``pyarrow.dataset.Dataset``, raises if some are missing.
+
+        Nothing is read until the dataset is scanned, e.g. with ``to_batches``,
+        and it can be handed to Dask or Polars as it is or through ``files``.
+        Every page is read with the common ``schema``.
+        """
+        schema = self.schema()
+        import pyarrow.dataset as ds
+
+        return ds.dataset(self.files, format="parquet", schema=schema)
+
+    def write_arrow(self, path: Union[str, os.PathLike]) -> None:
+        """Writes the persisted pages, in order and with the common ``schema``, to an Arrow IPC file.
+
+        Pages are read one at a time, and the file only appears once complete.
+        """
+        schema = self.schema()
+        pa = import_pyarrow()
+        import pyarrow.parquet as pq
+
+        path = os.fspath(path)
+        partial = f"{path}.partial"
+        try:
+            with pa.ipc.new_file(partial, schema) as writer:
+                for page_path in self.files:
+                    writer.write_table(pq.read_table(page_path).select(schema.names).cast(schema))
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Concatenates the fetched pages, raises if some are missing."""
+        if not self.complete:
+            raise ValueError(f"The pull is missing {len(self.missing_pages)} pages, resume it first.")
+        pages = self.pages()
+        return pd.concat(pages, ignore_index=True) if len(pages) > 1 else pages[0]
+
+
+class IncompletePullError(MLHubRequestError):
+    """Raised when some pages of training features couldn't be fetched, ``pull`` holds the pages that were."""
+
+    def __init__(self, pull: TrainingFeaturesPull):
+        super().__init__(
+            f"Failed to fetch {len(pull.missing_pages)} pages of {pull.endpoint}, "
+            "pass the pull of this error to FeatureStore.resume_training_features to fetch them."
+        )
+        self.pull = pull
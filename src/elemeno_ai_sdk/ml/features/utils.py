@@ -1,8 +1,12 @@
 import string
+from functools import lru_cache
 
 import jwt
 
 
+_PUNCTUATION_TO_DASH = str.maketrans({punctuation: "-" for punctuation in string.punctuation})
+
+
 def decode_api_key(api_key: str, verify_signature: bool = False) -> str:
     return jwt.decode(jwt=api_key, algorithms=["RS256"], options={"verify_signature": verify_signature})
 
@@ -13,12 +17,12 @@ def get_user_account_from_api_key(api_key: str) -> str:
 
 
 def parse_user_account(user_account: str) -> str:
-    for punctuation in string.punctuation:
-        user_account = user_account.replace(punctuation, "-")
-    return user_account
+    return user_account.translate(_PUNCTUATION_TO_DASH)
 
 
+@lru_cache(maxsize=64)
 def get_feature_server_url_from_api_key(api_key: str) -> str:
+    """Resolves the feature server url of the account owning ``api_key``, cached per key."""
     user_account = get_user_account_from_api_key(api_key)
     user_account = parse_user_account(user_account)
     return f"https://feature-server-{user_account}.app.elemeno.ai"
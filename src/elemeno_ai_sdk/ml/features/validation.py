@@ -0,0 +1,116 @@
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+from pandas.api import types
+
+
+EVENT_TIMESTAMP = "event_timestamp"
+
+
+class IngestValidationError(ValueError):
+    """Raised when data doesn't match the schema of the feature table it's ingested into."""
+
+    def __init__(self, feature_table_name: str, errors: List[str]):
+        super().__init__(f"Invalid data for feature table {feature_table_name}: {'; '.join(errors)}")
+        self.feature_table_name = feature_table_name
+        self.errors = errors
+
+
+def _is_int(column: pd.Series) -> bool:
+    if types.is_bool_dtype(column):
+        return False
+    if types.is_integer_dtype(column):
+        return True
+    # integer columns with nulls are read as floats
+    return types.is_float_dtype(column) and bool((column.dropna() % 1 == 0).all())
+
+
+def _is_float(column: pd.Series) -> bool:
+    return types.is_numeric_dtype(column) and not types.is_bool_dtype(column)
+
+
+def _is_timestamp(column: pd.Series) -> bool:
+    if types.is_datetime64_any_dtype(column):
+        return True
+    if not types.is_object_dtype(column) and not types.is_string_dtype(column):
+        return False
+    parsed = pd.to_datetime(column, errors="coerce", utc=True)
+    return bool((parsed.notna() | column.isna()).all())
+
+
+TYPE_CHECKS: Dict[str, Callable[[pd.Series], bool]] = {
+    "int": _is_int,
+    "int32": _is_int,
+    "int64": _is_int,
+    "float": _is_float,
+    "float32": _is_float,
+    "float64": _is_float,
+    "double": _is_float,
+    "bool": types.is_bool_dtype,
+    "string": lambda column: types.is_string_dtype(column) or types.is_object_dtype(column),
+    "timestamp": _is_timestamp,
+}
+
+
+def validate_frame(frame: pd.DataFrame, table: Dict[str, Any]) -> List[str]:
+    """Checks ``frame`` against a feature table definition and returns the problems found.
+
+    The column names must be lowercase and known to the table, the entities and
+    ``event_timestamp`` must be present without nulls, and every column must
+    hold values of its schema type. Types without a known check are accepted.
+    """
+    errors = []
+    schema = {feature["name"]: feature.get("type") for feature in table.get("schema", [])}
+    entities = list(table.get("entities", []))
+    known = set(schema) | set(entities)
+
+    uppercase = [str(name) for name in frame.columns if not str(name).islower()]
+    if uppercase:
+        errors.append(f"column names must be lowercase: {', '.join(uppercase)}")
+    unknown = [str(name) for name in frame.columns if name not in known and str(name).islower()]
+    if unknown and schema:
+        errors.append(f"columns not in the feature table schema: {', '.join(unknown)}")
+
+    required = entities + [EVENT_TIMESTAMP]
+    missing = [name for name in required if name not in frame.columns]
+    if missing:
+        errors.append(f"missing required columns: {', '.join(missing)}")
+
+    present = [name for name in required if name in frame.columns]
+    null_counts = frame[present].isna().sum()
+    for name, count in null_counts[null_counts > 0].items():
+        errors.append(f"column {name} has {count} null values")
+
+    for name, schema_type in schema.items():
+        check = TYPE_CHECKS.get(str(schema_type).lower())
+        if check is not None and name in frame.columns and not check(frame[name]):
+            errors.append(f"column {name} has dtype {frame[name].dtype}, expected {schema_type}")
+    return errors
+
+
+# pandas dtypes of the schema types, nullable so missing values don't turn ints into floats
+SCHEMA_DTYPES: Dict[str, str] = {
+    "int": "Int64",
+    "int32": "Int32",
+    "int64": "Int64",
+    "float": "float64",
+    "float32": "float32",
+    "float64": "float64",
+    "double": "float64",
+    "bool": "boolean",
+    "string": "string",
+}
+
+
+def apply_schema_dtypes(frame: pd.DataFrame, table: Dict[str, Any]) -> pd.DataFrame:
+    """Converts the columns of ``frame`` to the dtypes of their schema types, other columns are left as they are."""
+    converted = {}
+    for feature in table.get("schema", []):
+        name, schema_type = feature["name"], str(feature.get("type")).lower()
+        if name not in frame.columns:
+            continue
+        if schema_type == "timestamp":
+            converted[name] = pd.to_datetime(frame[name], utc=True)
+        elif schema_type in SCHEMA_DTYPES:
+            converted[name] = frame[name].astype(SCHEMA_DTYPES[schema_type])
+    return frame.assign(**converted) if converted else frame
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from elemeno_ai_sdk.logger import logger
+from elemeno_ai_sdk.ml.features.feature_store import FeatureStore
+from elemeno_ai_sdk.ml.features.ingest import BATCH_SIZE, INGEST_TARGETS
+
+
+# Seconds rows can wait in the buffer before being flushed
+FLUSH_INTERVAL = 1.0
+
+
+class FeatureWriter:
+    """Buffers rows written one at a time and ingests them in batches in the background.
+
+    The buffer is flushed when it holds ``max_rows`` rows or ``flush_interval``
+    seconds after the last flush, whichever comes first. ``write`` only waits
+    for a flush when ``max_buffered_rows`` rows are pending, which happens when
+    rows are written faster than the feature server takes them. Call ``close``,
+    or use the writer as an async context manager, to flush the remaining rows
+    and stop the background task. The number of rows ingested and failed so far
+    is kept in ``ingested_rows`` and ``failed_rows``.
+
+    args:
+
+    - feature_store: FeatureStore used to ingest the rows
+    - feature_table_name: Name of the feature table written to
+    - max_rows: Number of buffered rows that triggers a flush
+    - flush_interval: Maximum seconds between flushes
+    - max_buffered_rows: Number of pending rows at which ``write`` waits for a flush
+    - to: Stores to write to, online, offline or online_and_offline
+    - ingest_options: Other options passed to ``FeatureStore.ingest``
+    """
+
+    def __init__(
+        self,
+        feature_store: FeatureStore,
+        feature_table_name: str,
+        max_rows: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_buffered_rows: Optional[int] = None,
+        to: str = "online_and_offline",
+        **ingest_options,
+    ):
+        if to not in INGEST_TARGETS:
+            raise ValueError(f"Invalid target {to}. Please use one of {', '.join(INGEST_TARGETS)}.")
+        self.feature_store = feature_store
+        self.feature_table_name = feature_table_name
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max_buffered_rows if max_buffered_rows is not None else 10 * max_rows
+        self.to = to
+        self.ingest_options = ingest_options
+        self.ingested_rows = 0
+        self.failed_rows = 0
+        self._rows: List[Dict[str, Any]] = []
+        self._frames: List[pd.DataFrame] = []
+        self._buffered = 0
+        self._flush_lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._buffered
+
+    def start(self) -> None:
+        """Starts the background flushes, ``write`` calls it on first use."""
+        if self._closed:
+            raise RuntimeError("The FeatureWriter is closed.")
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def write(self, row: Dict[str, Any]) -> None:
+        """Buffers a row, given as a dict of column names to values."""
+        self.start()
+        self._rows.append(row)
+        await self._buffer_grew(1)
+
+    async def write_frame(self, frame: pd.DataFrame) -> None:
+        """Buffers all the rows of ``frame``."""
+        self.start()
+        if self._rows:
+            self._frames.append(pd.DataFrame(self._rows))
+            self._rows = []
+        self._frames.append(frame)
+        await self._buffer_grew(len(frame))
+
+    async def _buffer_grew(self, rows: int) -> None:
+        self._buffered += rows
+        if self._buffered >= self.max_buffered_rows:
+            await self.flush()
+        elif self._buffered >= self.max_rows:
+            self._full.set()
+
+    async def flush(self) -> None:
+        """Ingests the buffered rows, in order with the previous flushes."""
+        async with self._flush_lock:
+            frames = self._frames + ([pd.DataFrame(self._rows)] if self._rows else [])
+            self._rows, self._frames, self._buffered = [], [], 0
+            self._full.clear()
+            if not frames:
+                return
+            data = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            try:
+                report = await self.feature_store.ingest(
+                    self.feature_table_name, data, to=self.to, show_progress=False, **self.ingest_options
+                )
+            except Exception:
+                logger.exception(f"Failed to flush {len(data)} rows to {self.feature_table_name}.")
+                self.failed_rows += len(data)
+                return
+            self.ingested_rows += report.ingested_rows
+            self.failed_rows += report.failed_rows
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def close(self) -> None:
+        """Flushes the remaining rows and stops the background flushes."""
+        self._closed = True
+        if self._task is not None:
+            # wake the background task up so it flushes and exits, a flush in progress isn't interrupted
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def __aenter__(self) -> "FeatureWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -1,11 +1,21 @@
+import asyncio
 import json
 import os
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Dict, Optional, Union
 
 import aiohttp
-from tenacity import AsyncRetrying, RetryError, stop_after_attempt, wait_fixed
+from yarl import URL
 
 from elemeno_ai_sdk.logger import logger
+from elemeno_ai_sdk.ml.remote.circuit_breaker import get_circuit_breaker
+from elemeno_ai_sdk.ml.remote.compression import Compression
+from elemeno_ai_sdk.ml.remote.metrics import RequestMetrics, get_request_metrics
+from elemeno_ai_sdk.ml.remote.rate_limit import get_rate_limiter
+from elemeno_ai_sdk.ml.remote.retry import MLHubRequestError, RetryPolicy, parse_retry_after
+from elemeno_ai_sdk.ml.remote.serializers import JSONSerializer
+from elemeno_ai_sdk.ml.remote.session import MLHubSession
+from elemeno_ai_sdk.ml.remote.singleflight import SingleFlight
 from elemeno_ai_sdk.utils import mlhub_auth
 
 
@@ -13,15 +23,63 @@ from elemeno_ai_sdk.utils import mlhub_auth
 PROD_URL = "https://c3po.ml.semantixhub.com"
 DEV_URL = "https://c3po-stg.ml.semantixhub.com"
 
-# Retry params
-STOP_AFTER_ATTEMPT = 5
-WAIT_FIXED = 1
+
+def is_transient_failure(exc: BaseException) -> bool:
+    """Whether ``exc`` means the server is unavailable, as opposed to rejecting the request."""
+    if isinstance(exc, MLHubRequestError):
+        return exc.status is not None and exc.status >= 500
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
 
 
 class MLHubRemote:
-    def __init__(self, env: Optional[str] = None):
+    """Base client for MLHub services.
+
+    All requests go through a pooled ``MLHubSession``. Pass the ``session`` of an
+    existing client to make several clients share the same connection pool, and
+    call ``close`` (or use the client as an async context manager) when done.
+    Failed requests are retried according to ``retry_policy``, and a per-host
+    circuit breaker fails requests fast while a server keeps failing.
+
+    Passing a ``SingleFlight`` as ``single_flight`` makes concurrent ``get`` calls
+    with the same url and params share one request. Callers then receive the same
+    response object and must not modify it.
+
+    Latency, status, byte and retry metrics of every request are recorded in
+    ``metrics``, which defaults to the process wide ``RequestMetrics``. Requests
+    wait for the host's rate limit, see ``configure_rate_limit``. JSON bodies are
+    encoded and decoded by ``serializer``, which accepts numpy and pandas values.
+    Pass a ``Compression`` to compress large JSON bodies, the server must accept
+    the chosen Content-Encoding. Compressed responses need no option, aiohttp
+    asks for them and decompresses them on its own.
+    """
+
+    def __init__(
+        self,
+        env: Optional[str] = None,
+        session: Optional[MLHubSession] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        single_flight: Optional[SingleFlight] = None,
+        metrics: Optional[RequestMetrics] = None,
+        serializer: Optional[JSONSerializer] = None,
+        compression: Optional[Compression] = None,
+    ):
         if env:
             self._env = env
+        self.session = session if session is not None else MLHubSession()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.single_flight = single_flight
+        self.metrics = metrics if metrics is not None else get_request_metrics()
+        self.serializer = serializer if serializer is not None else JSONSerializer()
+        self.compression = compression
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
 
     @property
     def env(self):
@@ -42,36 +100,128 @@ class MLHubRemote:
             raise ValueError("Invalid environment. Please use dev or prod.")
         return base_url
 
+    @mlhub_auth
+    async def warm_up(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> None:
+        """Resolves the host of ``url`` and opens a pooled connection to it.
+
+        Later requests to the same host then skip the DNS lookup and the TCP/TLS
+        handshake. Failures are only logged, the requests will connect on their own.
+        """
+        try:
+            async with session.head(url, allow_redirects=False) as response:
+                await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            logger.warning(f"Failed to warm up the connection to {url}", exc_info=True)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        session: aiohttp.ClientSession,
+        decode: Callable[[bytes], Any],
+        data: Any = None,
+        **kwargs,
+    ) -> Any:
+        """Sends a request, retrying it according to the retry policy.
+
+        ``decode`` receives the raw response body, a ``ValueError`` it raises is
+        turned into an ``MLHubRequestError``. Raises the last error once the
+        request can't be retried anymore.
+        """
+        host = URL(url).host
+        breaker = get_circuit_breaker(host)
+        bytes_sent = len(data) if isinstance(data, (bytes, bytearray)) else 0
+        async for attempt in self.retry_policy.retrying(method):
+            with attempt:
+                if attempt.retry_state.attempt_number > 1:
+                    self.metrics.record_retry(method, url)
+                breaker.check()
+                try:
+                    limiter = get_rate_limiter(host)
+                    if limiter is not None:
+                        await limiter.acquire(bytes_sent)
+                    status, payload = None, b""
+                    self.metrics.request_started()
+                    start = time.perf_counter()
+                    try:
+                        async with session.request(method, url=url, data=data, **kwargs) as response:
+                            status = response.status
+                            payload = await response.read()
+                            if not response.ok:
+                                raise MLHubRequestError(
+                                    f"Failed {method.lower()} to {url} with: \n"
+                                    f"\t params= {kwargs.get('params')} \n"
+                                    f"\t status code= {response.status} \n"
+                                    f"\t response= {payload[:500].decode(errors='replace')}",
+                                    status=response.status,
+                                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                                )
+                    finally:
+                        self.metrics.request_finished(
+                            method,
+                            url,
+                            time.perf_counter() - start,
+                            status=status,
+                            bytes_sent=bytes_sent,
+                            bytes_received=len(payload),
+                        )
+                except Exception as exc:
+                    if is_transient_failure(exc):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    raise
+                except BaseException:
+                    # cancelled, the request says nothing about the host but mustn't keep the probe slot
+                    breaker.release()
+                    raise
+                breaker.record_success()
+                try:
+                    return decode(payload)
+                except ValueError as exc:
+                    # e.g. an HTML page from a proxy, not retried since the status is successful
+                    raise MLHubRequestError(
+                        f"Failed to decode the response of {method.lower()} to {url}: {exc} \n"
+                        f"\t response= {payload[:500].decode(errors='replace')}",
+                        status=status,
+                    ) from exc
+
     @mlhub_auth
     async def post(
         self,
         url: str,
-        body: Dict[str, Any] = None,
+        body: Union[Dict[str, Any], bytes] = None,
         session: Optional[aiohttp.ClientSession] = None,
         file=None,
+        raise_errors: bool = False,
+        headers: Optional[Dict[str, str]] = None,
     ):
+        """Posts ``body`` as JSON, or ``file`` as is, and returns the response text.
+
+        ``body`` can also be given already encoded by the client's serializer.
+        ``headers`` are added to the request, e.g. the Content-Type of ``file``.
+
+        Returns None once the request fails for good, unless ``raise_errors`` is set.
+        """
         if file is not None and body is not None:
             raise ValueError("Either body or file can be sent, but not both.")
         elif file is not None:
             data = file
         else:
-            data = json.dumps(body)
+            data = body if isinstance(body, (bytes, bytearray)) else self.serializer.dumps(body)
+            headers = {"Content-Type": self.serializer.content_type, **(headers or {})}
+            if self.compression is not None:
+                data, headers = self.compression.encode(data, headers)
+
+        def decode(payload: bytes) -> str:
+            return payload.decode()
 
         try:
-            retry_operator = AsyncRetrying(stop=stop_after_attempt(STOP_AFTER_ATTEMPT), wait=wait_fixed(WAIT_FIXED))
-            async for attempt in retry_operator:
-                with attempt:
-                    async with session.post(url=url, data=data) as response:
-                        if not response.ok:
-                            raise ValueError(
-                                f"Failed post to {url} with: \n"
-                                f"\t status code= {response.status} \n"
-                                f"\t message_body= {body} \n"
-                                f"\t header= {session.headers}"
-                            )
-                        return await response.text()
-        except RetryError:
-            logger.exception("Max retries reached")
+            return await self._request("POST", url, session, decode, data=data, headers=headers)
+        except (MLHubRequestError, aiohttp.ClientError, asyncio.TimeoutError):
+            if raise_errors:
+                raise
+            logger.exception(f"Failed post to {url}")
             return None
 
     @mlhub_auth
@@ -81,24 +231,28 @@ class MLHubRemote:
         params: Optional[Dict[str, Any]] = None,
         is_binary: bool = False,
         session: Optional[aiohttp.ClientSession] = None,
+        raise_errors: bool = False,
     ):
-        try:
-            retry_operator = AsyncRetrying(stop=stop_after_attempt(STOP_AFTER_ATTEMPT), wait=wait_fixed(WAIT_FIXED))
-            async for attempt in retry_operator:
-                with attempt:
-                    async with session.get(url=url, params=params) as response:
-                        if not response.ok:
-                            raise ValueError(
-                                f"Failed to get from {url} with: \n"
-                                f"\t params= {params} \n"
-                                f"\t status code= {response.status} \n"
-                                f"\t header= {session.headers}"
-                            )
-
-                        if is_binary:
-                            return await response.content.read()
-
-                        return await response.json(content_type=response.content_type)
-        except RetryError:
-            logger.exception("Max retries reached")
-            return None
+        """Gets ``url`` and returns the decoded JSON response, or the raw bytes if ``is_binary``.
+
+        Returns None once the request fails for good, unless ``raise_errors`` is set.
+        """
+
+        def decode(payload: bytes) -> Any:
+            if is_binary:
+                return payload
+            return self.serializer.loads(payload)
+
+        async def request() -> Any:
+            try:
+                return await self._request("GET", url, session, decode, params=params)
+            except (MLHubRequestError, aiohttp.ClientError, asyncio.TimeoutError):
+                if raise_errors:
+                    raise
+                logger.exception(f"Failed to get from {url}")
+                return None
+
+        if self.single_flight is None:
+            return await request()
+        key = (url, json.dumps(params, sort_keys=True, default=str), is_binary, raise_errors)
+        return await self.single_flight.do(key, request)
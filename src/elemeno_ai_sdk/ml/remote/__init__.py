@@ -0,0 +1,13 @@
+from elemeno_ai_sdk.ml.remote.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    configure_circuit_breaker,
+)
+from elemeno_ai_sdk.ml.remote.compression import Compression
+from elemeno_ai_sdk.ml.remote.concurrency import AdaptiveConcurrency
+from elemeno_ai_sdk.ml.remote.metrics import RequestMetrics, get_request_metrics
+from elemeno_ai_sdk.ml.remote.rate_limit import RateLimiter, configure_rate_limit
+from elemeno_ai_sdk.ml.remote.retry import MLHubRequestError, RetryPolicy
+from elemeno_ai_sdk.ml.remote.serializers import JSONSerializer
+from elemeno_ai_sdk.ml.remote.session import MLHubSession, shared_session
+from elemeno_ai_sdk.ml.remote.singleflight import SingleFlight
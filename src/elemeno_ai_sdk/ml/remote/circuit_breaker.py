@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Dict
+
+from elemeno_ai_sdk.logger import logger
+from elemeno_ai_sdk.ml.remote.retry import MLHubRequestError
+
+
+# Circuit breaker params
+FAILURE_THRESHOLD = 5
+RECOVERY_TIMEOUT = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(MLHubRequestError):
+    """Raised instead of sending a request while the circuit of its host is open."""
+
+
+class CircuitBreaker:
+    """Stops sending requests to a host after consecutive transient failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and requests
+    fail fast. Once ``recovery_timeout`` seconds have passed a single probe request
+    is let through: its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self, host: str, failure_threshold: int = FAILURE_THRESHOLD, recovery_timeout: float = RECOVERY_TIMEOUT
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    return False
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit for {self.host} closed.")
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit for {self.host} opened after {self._failures} consecutive failures.")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Frees the probe slot of a request that ended without an outcome, e.g. when it was cancelled."""
+        with self._lock:
+            self._probing = False
+
+    def check(self) -> None:
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit for {self.host} is open, not sending the request.")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """Returns the process wide circuit breaker of ``host``."""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def configure_circuit_breaker(
+    host: str, failure_threshold: int = FAILURE_THRESHOLD, recovery_timeout: float = RECOVERY_TIMEOUT
+) -> CircuitBreaker:
+    """Replaces the circuit breaker of ``host`` with one using the given thresholds."""
+    with _breakers_lock:
+        _breakers[host] = CircuitBreaker(host, failure_threshold=failure_threshold, recovery_timeout=recovery_timeout)
+        return _breakers[host]
@@ -0,0 +1,47 @@
+import gzip
+import zlib
+from typing import Dict, Optional, Tuple
+
+
+# Bodies smaller than this are sent as they are, compressing them costs more than it saves
+COMPRESSION_THRESHOLD = 1024
+COMPRESSION_LEVEL = 6
+ENCODINGS = ("gzip", "deflate")
+
+
+class Compression:
+    """Compresses request bodies.
+
+    Request bodies of at least ``threshold`` bytes are compressed and sent with a
+    Content-Encoding header, so the server must support decoding it. Responses
+    don't need it, aiohttp already requests them compressed and decompresses them.
+
+    args:
+
+    - encoding: Request body encoding, gzip or deflate
+    - threshold: Minimum body size in bytes to compress
+    - level: Compression level, from 1 (fastest) to 9 (smallest)
+    """
+
+    def __init__(self, encoding: str = "gzip", threshold: int = COMPRESSION_THRESHOLD, level: int = COMPRESSION_LEVEL):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Invalid encoding {encoding}. Please use one of {', '.join(ENCODINGS)}.")
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+
+    def compress(self, data: bytes) -> Tuple[bytes, Optional[str]]:
+        """Returns the body to send and its Content-Encoding, None when left uncompressed."""
+        if len(data) < self.threshold:
+            return data, None
+        if self.encoding == "gzip":
+            return gzip.compress(data, compresslevel=self.level, mtime=0), "gzip"
+        return zlib.compress(data, self.level), "deflate"
+
+    def encode(self, data: bytes, headers: Optional[Dict[str, str]] = None) -> Tuple[bytes, Dict[str, str]]:
+        """Compresses ``data`` if it's large enough and adds the matching Content-Encoding header."""
+        headers = dict(headers or {})
+        data, encoding = self.compress(data)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return data, headers
@@ -0,0 +1,65 @@
+from typing import Optional
+
+
+# Adaptive concurrency params
+INITIAL_LIMIT = 4
+MIN_LIMIT = 1
+MAX_LIMIT = 32
+LATENCY_TOLERANCE = 2.0
+BACKOFF_RATIO = 0.5
+
+
+class AdaptiveConcurrency:
+    """Chooses how many requests to keep in flight with additive increase, multiplicative decrease.
+
+    Every successful request whose latency stays within ``latency_tolerance``
+    times the lowest latency seen grows the limit by ``1 / limit``, so by about
+    one request per round of requests. A failure or a latency spike, which
+    means the server or the network is saturating, multiplies the limit by
+    ``backoff_ratio``. It's decreased at most once per round, since the
+    requests already in flight report the same congestion.
+
+    args:
+
+    - initial_limit: Number of requests in flight to start with
+    - min_limit: Lower bound of the limit
+    - max_limit: Upper bound of the limit
+    - latency_tolerance: Ratio to the lowest latency above which a request counts as a spike
+    - backoff_ratio: Factor applied to the limit on failures and spikes
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = INITIAL_LIMIT,
+        min_limit: int = MIN_LIMIT,
+        max_limit: int = MAX_LIMIT,
+        latency_tolerance: float = LATENCY_TOLERANCE,
+        backoff_ratio: float = BACKOFF_RATIO,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max_limit, max(min_limit, initial_limit)))
+        self._min_latency: Optional[float] = None
+        self._cooldown = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def observe(self, latency: Optional[float], ok: bool = True) -> None:
+        """Updates the limit with the outcome of a request that took ``latency`` seconds."""
+        spike = False
+        if ok and latency is not None:
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            spike = latency > self.latency_tolerance * self._min_latency
+        if self._cooldown > 0:
+            self._cooldown -= 1
+        if not ok or spike:
+            if self._cooldown == 0:
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self._cooldown = max(1, self.limit)
+        else:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
@@ -0,0 +1,205 @@
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from yarl import URL
+
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # the last position counts observations above every bucket bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Returns (upper bound, observations <= bound) pairs, ending with the +Inf bucket."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates the q-quantile as the upper bound of the bucket containing it."""
+        if self.count == 0:
+            return None
+        for bound, total in self.cumulative():
+            if total >= q * self.count:
+                return bound
+        return float("inf")
+
+
+class EndpointMetrics:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.latency = Histogram(buckets)
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def requests(self) -> int:
+        return self.latency.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_sum": self.latency.sum,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "latency_p99": self.latency.quantile(0.99),
+            "latency_buckets": self.latency.cumulative(),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+class RequestMetrics:
+    """Collects per-endpoint request metrics of MLHub clients.
+
+    Every request attempt is recorded under its method and url, without the
+    query string, so retries of the same call show up as several requests.
+    Use ``snapshot`` to query the metrics from Python or ``to_prometheus`` to
+    export them in the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(method: str, url: str) -> Tuple[str, str]:
+        return method.upper(), str(URL(url).with_query(None).with_fragment(None))
+
+    def _endpoint(self, method: str, url: str) -> EndpointMetrics:
+        key = self.endpoint_key(method, url)
+        if key not in self._endpoints:
+            self._endpoints[key] = EndpointMetrics(self.buckets)
+        return self._endpoints[key]
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def request_finished(
+        self,
+        method: str,
+        url: str,
+        latency: float,
+        status: Optional[int] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """Records a finished attempt, ``status`` is None when no response was received.
+
+        ``bytes_received`` is the size of the response body once decompressed, aiohttp doesn't expose its wire size.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            endpoint = self._endpoint(method, url)
+            endpoint.latency.observe(latency)
+            endpoint.statuses[status if status is not None else "error"] += 1
+            if status is None or status >= 400:
+                endpoint.errors += 1
+            endpoint.bytes_sent += bytes_sent
+            endpoint.bytes_received += bytes_received
+
+    def record_retry(self, method: str, url: str) -> None:
+        with self._lock:
+            self._endpoint(method, url).retries += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self.max_in_flight = self.in_flight
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the current metrics, endpoints are keyed by "<METHOD> <url>"."""
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "endpoints": {
+                    f"{method} {url}": metrics.to_dict() for (method, url), metrics in self._endpoints.items()
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "mlhub") -> str:
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_requests_in_flight Requests currently being sent.",
+                f"# TYPE {prefix}_requests_in_flight gauge",
+                f"{prefix}_requests_in_flight {self.in_flight}",
+            ]
+            endpoints = sorted(self._endpoints.items())
+
+            lines += [
+                f"# HELP {prefix}_request_duration_seconds Latency of request attempts.",
+                f"# TYPE {prefix}_request_duration_seconds histogram",
+            ]
+            for (method, url), metrics in endpoints:
+                labels = f'method="{method}",endpoint="{_escape(url)}"'
+                for bound, total in metrics.latency.cumulative():
+                    lines.append(
+                        f'{prefix}_request_duration_seconds_bucket{{{labels},le="{_format_bound(bound)}"}} {total}'
+                    )
+                lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {metrics.latency.sum}")
+                lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {metrics.latency.count}")
+
+            lines += [
+                f"# HELP {prefix}_requests_total Request attempts by response status.",
+                f"# TYPE {prefix}_requests_total counter",
+            ]
+            for (method, url), metrics in endpoints:
+                labels = f'method="{method}",endpoint="{_escape(url)}"'
+                for status, count in sorted(metrics.statuses.items(), key=lambda item: str(item[0])):
+                    lines.append(f'{prefix}_requests_total{{{labels},status="{status}"}} {count}')
+
+            counters = [
+                ("request_retries_total", "Retried request attempts.", "retries"),
+                ("request_sent_bytes_total", "Bytes sent in request bodies.", "bytes_sent"),
+                ("response_received_bytes_total", "Bytes of response bodies, once decompressed.", "bytes_received"),
+            ]
+            for name, description, attribute in counters:
+                lines += [f"# HELP {prefix}_{name} {description}", f"# TYPE {prefix}_{name} counter"]
+                for (method, url), metrics in endpoints:
+                    labels = f'method="{method}",endpoint="{_escape(url)}"'
+                    lines.append(f"{prefix}_{name}{{{labels}}} {getattr(metrics, attribute)}")
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def get_request_metrics() -> RequestMetrics:
+    """Returns the process wide metrics, used by clients that weren't given their own."""
+    return request_metrics
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second, holding up to ``capacity`` tokens.
+
+    Tokens are reserved as soon as they're asked for, possibly leaving the bucket
+    in debt, so concurrent callers are served in arrival order and a request larger
+    than the capacity still goes through once the bucket could have held it.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Takes ``amount`` tokens and returns how many seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= amount
+            # wait until the bucket would have held min(amount, capacity) tokens before this reservation
+            deficit = min(amount, self.capacity) - amount - self._tokens
+            return max(0.0, deficit / self.rate)
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """Limits the requests and bytes per second sent to a host.
+
+    args:
+
+    - requests_per_second: Sustained request rate, None for no limit
+    - bytes_per_second: Sustained request body throughput, None for no limit
+    - burst: Seconds worth of rate that can be spent at once after being idle
+    """
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        bytes_per_second: Optional[float] = None,
+        burst: float = 1.0,
+    ):
+        self.requests = TokenBucket(requests_per_second, requests_per_second * burst) if requests_per_second else None
+        self.bytes = TokenBucket(bytes_per_second, bytes_per_second * burst) if bytes_per_second else None
+
+    async def acquire(self, nbytes: int = 0) -> None:
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.bytes is not None and nbytes:
+            delay = max(delay, self.bytes.reserve(nbytes))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(
+    host: str,
+    requests_per_second: Optional[float] = None,
+    bytes_per_second: Optional[float] = None,
+    burst: float = 1.0,
+) -> Optional[RateLimiter]:
+    """Sets the process wide rate limit of ``host``, shared by every MLHub client.
+
+    Calling it without rates removes the limit.
+    """
+    with _limiters_lock:
+        if requests_per_second is None and bytes_per_second is None:
+            _limiters.pop(host, None)
+            return None
+        _limiters[host] = RateLimiter(requests_per_second, bytes_per_second, burst)
+        return _limiters[host]
+
+
+def get_rate_limiter(host: str) -> Optional[RateLimiter]:
+    return _limiters.get(host)
@@ -0,0 +1,117 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+import aiohttp
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt
+
+
+# Retry params
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+
+# Statuses worth retrying, the server may succeed on a later attempt
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Statuses that guarantee the request was not processed, so even non-idempotent requests can be retried
+UNPROCESSED_STATUSES = frozenset({429, 503})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class MLHubRequestError(ValueError):
+    """Raised when MLHub answers with a non successful status code."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header, given either in seconds or as an HTTP date, into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Decides which failed requests are retried and how long to wait between attempts.
+
+    Waits follow an exponential backoff with full jitter, so concurrent callers
+    failing together spread their retries instead of hitting the server in lockstep.
+    A Retry-After header sent by the server takes precedence over the backoff.
+    Non-idempotent requests are only retried when they could not have been processed.
+
+    args:
+
+    - max_attempts: Total number of attempts, including the first one
+    - base_delay: Backoff base in seconds, the n-th retry waits up to base_delay * 2 ** (n - 1)
+    - max_delay: Upper bound for a single wait, including Retry-After waits
+    - retry_statuses: Status codes that are retried for idempotent methods
+    - idempotent_methods: HTTP methods that are safe to repeat
+    - respect_retry_after: Whether to honor the server's Retry-After header
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = MAX_ATTEMPTS,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES,
+        idempotent_methods: FrozenSet[str] = IDEMPOTENT_METHODS,
+        respect_retry_after: bool = True,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self.idempotent_methods = idempotent_methods
+        self.respect_retry_after = respect_retry_after
+
+    def is_retryable(self, method: str, exc: BaseException) -> bool:
+        idempotent = method.upper() in self.idempotent_methods
+        if isinstance(exc, MLHubRequestError):
+            if exc.status is None:
+                return False
+            if idempotent:
+                return exc.status in self.retry_statuses
+            return exc.status in self.retry_statuses and exc.status in UNPROCESSED_STATUSES
+        if isinstance(exc, aiohttp.ClientConnectorError):
+            # the connection was never established, nothing reached the server
+            return True
+        if isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return idempotent
+        return False
+
+    def backoff(self, attempt_number: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt_number - 1)))
+
+    def wait(self, retry_state: RetryCallState) -> float:
+        delay = self.backoff(retry_state.attempt_number)
+        exc = retry_state.outcome.exception() if retry_state.outcome is not None else None
+        retry_after = getattr(exc, "retry_after", None)
+        if self.respect_retry_after and retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def retrying(self, method: str, **kwargs) -> AsyncRetrying:
+        """Builds the tenacity retrying operator for a request with the given HTTP method."""
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=self.wait,
+            retry=retry_if_exception(lambda exc: self.is_retryable(method, exc)),
+            reraise=True,
+            **kwargs,
+        )
@@ -0,0 +1,88 @@
+import datetime
+import json
+import math
+from decimal import Decimal
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+
+def to_json_compatible(obj: Any) -> Any:
+    """Converts numpy, pandas and datetime values into types JSON encoders support."""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, np.datetime64):
+        return None if np.isnat(obj) else pd.Timestamp(obj).isoformat()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "M":
+            # tolist gives integer nanoseconds, ISO strings like orjson instead
+            return [to_json_compatible(value) for value in obj]
+        return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def replace_non_finite(obj: Any) -> Any:
+    """Replaces NaN and infinite floats with None, the way orjson encodes them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [replace_non_finite(value) for value in obj]
+    return obj
+
+
+class JSONSerializer:
+    """Encodes request bodies and decodes response bodies as JSON.
+
+    Uses orjson when it's installed, which is several times faster and encodes
+    numpy arrays natively, and falls back to the standard library otherwise.
+    Both encode numpy scalars and arrays, pandas timestamps and datetimes, and
+    encode ``pd.NA``, NaN and infinite floats as null. Responses orjson can't
+    parse are decoded with the standard library.
+
+    args:
+
+    - use_orjson: Force using (True) or not using (False) orjson, by default it's used if installed
+    """
+
+    content_type = "application/json"
+
+    def __init__(self, use_orjson: Optional[bool] = None):
+        if use_orjson and orjson is None:
+            raise ImportError("orjson is not installed, install it with `pip install elemeno-ai-sdk[fast]`.")
+        self.use_orjson = orjson is not None if use_orjson is None else use_orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        if self.use_orjson:
+            return orjson.dumps(obj, default=to_json_compatible, option=orjson.OPT_SERIALIZE_NUMPY)
+        # the standard library writes NaN and Infinity literals, most JSON parsers reject them
+        return json.dumps(
+            replace_non_finite(obj),
+            default=lambda value: replace_non_finite(to_json_compatible(value)),
+            separators=(",", ":"),
+        ).encode()
+
+    def loads(self, payload: bytes) -> Any:
+        if not payload.strip():
+            return None
+        if self.use_orjson:
+            try:
+                return orjson.loads(payload)
+            except orjson.JSONDecodeError:
+                # orjson is strict, e.g. it rejects the NaN literal Python servers emit
+                pass
+        return json.loads(payload)
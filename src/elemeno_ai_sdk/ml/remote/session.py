@@ -0,0 +1,128 @@
+import asyncio
+import os
+from typing import AsyncGenerator, Dict, Optional, Tuple
+
+import aiohttp
+
+from elemeno_ai_sdk.logger import logger
+
+
+# Connection pool defaults
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 0
+KEEPALIVE_TIMEOUT = 30.0
+DNS_CACHE_TTL = 300
+
+
+def mlhub_headers() -> Dict[str, str]:
+    api_key = os.getenv("MLHUB_API_KEY")
+    if api_key is None:
+        raise ValueError("Please set the MLHUB_API_KEY environment variable.")
+    return {
+        "x-api-key": api_key,
+        "authorization": f"Bearer {api_key}",
+    }
+
+
+class MLHubSession:
+    """A pooled aiohttp session that can be shared by several MLHub clients.
+
+    The underlying ``aiohttp.ClientSession`` is created lazily on first use, so
+    connections (and their TCP/TLS handshakes) are reused across every request
+    made through the clients holding this object. Call ``close`` when done, or
+    use it as an async context manager.
+
+    aiohttp sessions are bound to an event loop, so one is kept per loop the
+    object is used from, e.g. one per ``asyncio.run``. Each is closed when its
+    loop shuts down its async generators, which ``asyncio.run`` does before
+    closing the loop, so clients that are never closed don't leak connections.
+
+    args:
+
+    - limit: Maximum number of open connections in the pool
+    - limit_per_host: Maximum number of open connections per host, 0 means no limit
+    - keepalive_timeout: Seconds an idle connection is kept open for reuse
+    - ttl_dns_cache: Seconds a DNS resolution is cached
+    - timeout: Optional aiohttp.ClientTimeout applied to every request
+    - headers: Default headers, defaults to the MLHub authentication headers
+    """
+
+    def __init__(
+        self,
+        limit: int = CONNECTION_LIMIT,
+        limit_per_host: int = CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        ttl_dns_cache: Optional[int] = DNS_CACHE_TTL,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = timeout
+        self.headers = headers
+        # the session of every loop, with the async generator closing it on the loop's shutdown
+        self._sessions: Dict[asyncio.AbstractEventLoop, Tuple[aiohttp.ClientSession, AsyncGenerator]] = {}
+
+    @property
+    def closed(self) -> bool:
+        return all(session.closed for session, _ in self._sessions.values())
+
+    async def get(self) -> aiohttp.ClientSession:
+        """Returns the pooled session of the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        for other in [other for other in self._sessions if other.is_closed()]:
+            # closed without shutting down its async generators, its connections are already unusable
+            logger.debug("Dropping the MLHub session of a closed event loop.")
+            del self._sessions[other]
+        if loop in self._sessions and not self._sessions[loop][0].closed:
+            return self._sessions[loop][0]
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        headers = self.headers if self.headers is not None else mlhub_headers()
+        kwargs = {"timeout": self.timeout} if self.timeout is not None else {}
+        session = aiohttp.ClientSession(connector=connector, headers=headers, **kwargs)
+        closer = self._close_on_shutdown(loop, session)
+        # starting the generator registers it with the loop, which closes it in shutdown_asyncgens
+        await closer.__anext__()
+        self._sessions[loop] = (session, closer)
+        return session
+
+    async def _close_on_shutdown(
+        self, loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession
+    ) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            if self._sessions.get(loop, (None,))[0] is session:
+                del self._sessions[loop]
+            await session.close()
+
+    async def close(self) -> None:
+        """Closes the session of the running event loop, the ones of other loops close when their loop shuts down."""
+        entry = self._sessions.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+    async def __aenter__(self) -> "MLHubSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+_shared_session = MLHubSession()
+
+
+def shared_session() -> MLHubSession:
+    """Returns a process wide session.
+
+    Clients created with ``session=shared_session()`` keep reusing the same warm
+    connections even when they're constructed per request, as in serverless handlers.
+    """
+    return _shared_session
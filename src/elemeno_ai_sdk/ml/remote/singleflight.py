@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into a single in-flight call.
+
+    While a call for a given key is running, other callers asking for the same
+    key await its result instead of starting their own. Every caller receives the
+    same result object, so it must be treated as read-only. Cancelling one caller
+    does not cancel the shared call for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        # futures belong to a loop, so calls are only shared within the same loop
+        call_key = (id(asyncio.get_running_loop()), key)
+        call = self._calls.get(call_key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[call_key] = call
+            call.add_done_callback(lambda done: self._forget(call_key, done))
+        return await asyncio.shield(call)
+
+    def _forget(self, call_key: Tuple[int, Hashable], call: asyncio.Future) -> None:
+        if self._calls.get(call_key) is call:
+            del self._calls[call_key]
+        if not call.cancelled():
+            # mark the exception as retrieved even if every caller was cancelled
+            call.exception()
@@ -0,0 +1,150 @@
+"""Blocking versions of the MLHub clients, for code that doesn't run an event loop.
+
+Every client method runs on one persistent event loop living in a background
+thread, so connections are pooled and reused across calls instead of being
+torn down by a fresh ``asyncio.run`` each time::
+
+    from elemeno_ai_sdk.sync import FeatureStore
+
+    fs = FeatureStore()
+    df = fs.get_training_features("my_table", date_from="2023-01-01", date_to="2023-01-31")
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+from elemeno_ai_sdk.connector.datasource import DataSource as AsyncDataSource
+from elemeno_ai_sdk.ml.features.feature_store import FeatureStore as AsyncFeatureStore
+from elemeno_ai_sdk.ml.features.feature_table import FeatureTable as AsyncFeatureTable
+
+
+class BackgroundLoop:
+    """An event loop running forever in a daemon thread, started on first use."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="elemeno-ai-sdk-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Runs ``coro`` on the background loop and blocks until it finishes."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError(
+                "Blocking calls can't be made from the background loop itself, await the coroutine instead."
+            )
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._loop is None:
+                return
+            # closes the sessions of the clients that used the loop, see MLHubSession
+            asyncio.run_coroutine_threadsafe(self._loop.shutdown_asyncgens(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+_background_loop = BackgroundLoop()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Returns the loop shared by every sync client that wasn't given its own."""
+    return _background_loop
+
+
+class SyncClient:
+    """Exposes the coroutine methods of an async client as blocking methods.
+
+    Async generator methods become generators, each item being fetched on the
+    background loop. Other attributes are returned as they are.
+    """
+
+    def __init__(self, client: Any, background_loop: Optional[BackgroundLoop] = None):
+        self._client = client
+        self._background_loop = background_loop if background_loop is not None else get_background_loop()
+
+    @property
+    def client(self) -> Any:
+        """The wrapped async client."""
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if inspect.isasyncgenfunction(attr):
+            return self._iterating(attr)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def blocking(*args, **kwargs):
+            return self._background_loop.run(attr(*args, **kwargs))
+
+        return blocking
+
+    def _iterating(self, attr: Callable[..., AsyncIterator]) -> Callable[..., Iterator]:
+        async def next_item(iterator: AsyncIterator) -> Any:
+            return await iterator.__anext__()
+
+        async def close(iterator: AsyncIterator) -> None:
+            await iterator.aclose()
+
+        @functools.wraps(attr)
+        def iterating(*args, **kwargs):
+            iterator = attr(*args, **kwargs)
+            try:
+                while True:
+                    try:
+                        item = self._background_loop.run(next_item(iterator))
+                    except StopAsyncIteration:
+                        return
+                    yield item
+            finally:
+                self._background_loop.run(close(iterator))
+
+        return iterating
+
+    def close(self) -> None:
+        self._background_loop.run(self._client.close())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class FeatureStore(SyncClient):
+    def __init__(self, *args, background_loop: Optional[BackgroundLoop] = None, **kwargs):
+        super().__init__(AsyncFeatureStore(*args, **kwargs), background_loop)
+
+
+class FeatureTable(SyncClient):
+    def __init__(self, *args, background_loop: Optional[BackgroundLoop] = None, **kwargs):
+        super().__init__(AsyncFeatureTable(*args, **kwargs), background_loop)
+
+
+class DataSource(SyncClient):
+    def __init__(self, *args, background_loop: Optional[BackgroundLoop] = None, **kwargs):
+        super().__init__(AsyncDataSource(*args, **kwargs), background_loop)
+
+
+class AutoMLClient(SyncClient):
+    def __init__(self, *args, background_loop: Optional[BackgroundLoop] = None, **kwargs):
+        # imported here since the automl client pulls scikit-learn and matplotlib
+        from elemeno_ai_sdk.ml.automl.client import AutoMLClient as AsyncAutoMLClient
+
+        super().__init__(AsyncAutoMLClient(*args, **kwargs), background_loop)
@@ -1,4 +1,3 @@
-import os
 from functools import wraps
 from typing import Callable, Optional
 
@@ -8,6 +7,12 @@ from elemeno_ai_sdk.logger import logger
 
 
 def mlhub_auth(func: Callable):
+    """Injects the client's pooled, authenticated session into ``func``.
+
+    The decorated method must belong to an object exposing a ``session``
+    attribute of type ``MLHubSession``.
+    """
+
     @wraps(func)
     async def wrapper(
             self,
@@ -16,22 +21,12 @@ def mlhub_auth(func: Callable):
             **kwargs):
 
         if session is None:
-            api_key = os.getenv("MLHUB_API_KEY")
-            if api_key is None:
-                raise ValueError("Please set the MLHUB_API_KEY environment variable.")
-            headers = {
-                "x-api-key": api_key,
-                "authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-            async with aiohttp.ClientSession(headers=headers) as session:
-                kwargs["session"] = session
-                return await func(self, *args, **kwargs)
+            session = await self.session.get()
         else:
             logger.warning(
                 "Calling a method anottated with with_auth and passing a session object is not recommended in production."
             )
-            kwargs["session"] = session
-            return await func(self, *args, **kwargs)
+        kwargs["session"] = session
+        return await func(self, *args, **kwargs)
 
     return wrapper
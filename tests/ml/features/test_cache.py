@@ -0,0 +1,53 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from elemeno_ai_sdk.ml.features.cache import FeatureCache
+
+
+pytest.importorskip("pyarrow")
+
+
+def test_feature_cache_evicts_least_recently_read(tmp_path):
+    frame = pd.DataFrame({"id": range(1000), "value": [float(i) for i in range(1000)]})
+    cache = FeatureCache(tmp_path, max_bytes=10**9)
+    for key in "abc":
+        cache.put(key, frame)
+    # make the reads order unambiguous whatever the file system time resolution
+    for age, key in enumerate("cab"):
+        path = tmp_path / f"{key}.parquet"
+        os.utime(path, (time.time() - 100 + age, os.stat(path).st_mtime))
+    assert cache.get("b") is not None
+
+    cache.max_bytes = 2 * os.path.getsize(tmp_path / "a.parquet")
+    cache.evict()
+
+    assert cache.get("c") is None
+    pd.testing.assert_frame_equal(cache.get("a"), frame)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (2, 1, 1)
+
+
+def test_feature_cache_expires_entries(tmp_path):
+    cache = FeatureCache(tmp_path, ttl=60)
+    cache.put("a", pd.DataFrame({"id": [1]}))
+    path = tmp_path / "a.parquet"
+    os.utime(path, (time.time(), time.time() - 120))
+
+    assert cache.get("a") is None
+    assert cache.stats.expired == 1
+    assert not path.exists()
+
+
+def test_feature_cache_keeps_closed_days(tmp_path):
+    cache = FeatureCache(tmp_path, ttl=60)
+    key = FeatureCache.day_key("table", "2023-01-01")
+    cache.put(key, pd.DataFrame({"id": [1]}))
+    path = tmp_path / f"{key}.parquet"
+    os.utime(path, (time.time(), time.time() - 120))
+    cache.evict()
+    assert cache.get(key) is not None
+
+    cache.day_ttl = 60
+    assert cache.get(key) is None
@@ -0,0 +1,515 @@
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+import pandas as pd
+import pytest
+
+from elemeno_ai_sdk.ml.features.cache import FeatureCache
+from elemeno_ai_sdk.ml.features.delta import RowHashIndex
+from elemeno_ai_sdk.ml.features.feature_store import FeatureStore
+from elemeno_ai_sdk.ml.features.ingest import BatchSizer
+from elemeno_ai_sdk.ml.features.journal import IngestJournal
+from elemeno_ai_sdk.ml.features.payloads import ARROW_CONTENT_TYPE, PARQUET_CONTENT_TYPE
+from elemeno_ai_sdk.ml.features.pull import IncompletePullError, TrainingFeaturesPull
+from elemeno_ai_sdk.ml.features.validation import IngestValidationError, validate_frame
+from elemeno_ai_sdk.ml.features.writer import FeatureWriter
+from elemeno_ai_sdk.ml.remote import circuit_breaker
+from elemeno_ai_sdk.ml.remote.retry import RetryPolicy
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("MLHUB_API_KEY", "test-key")
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+
+@pytest.fixture
+async def feature_server(aiohttp_server):
+    """A stand-in feature server keeping the pushed rows in memory."""
+    state = {
+        "rows": [],
+        "batch_bytes": [],
+        "formats": [],
+        "in_flight": 0,
+        "max_in_flight": 0,
+        "reject": set(),
+        "formats_supported": {"arrow", "parquet"},
+        "list_calls": 0,
+        "targets": [],
+        "history": make_history(250),
+        "pages_served": [],
+        "windows": [],
+        "failing_pages": {},
+        "missing_tables": set(),
+    }
+
+    async def push(request):
+        payload = await request.read()
+        state["batch_bytes"].append(len(payload))
+        if request.match_info["table"] in state["missing_tables"]:
+            return aiohttp.web.Response(status=404)
+        if request.content_type == ARROW_CONTENT_TYPE and "arrow" in state["formats_supported"]:
+            import pyarrow as pa
+
+            frame = pa.ipc.open_stream(payload).read_pandas()
+        elif request.content_type == PARQUET_CONTENT_TYPE and "parquet" in state["formats_supported"]:
+            import pyarrow.parquet as pq
+
+            frame = pq.read_table(io.BytesIO(payload)).to_pandas()
+        elif request.content_type == "application/json":
+            body = await request.json()
+            frame = pd.DataFrame(body["df"])
+            state["targets"].append(body["to"])
+        else:
+            return aiohttp.web.Response(status=415)
+        state["formats"].append(request.content_type)
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        if state["reject"] & set(frame["id"]):
+            return aiohttp.web.Response(status=400)
+        state["rows"].extend(frame.to_dict("records"))
+        return aiohttp.web.json_response({"status": "ok"})
+
+    async def list_feature_views(request):
+        state["list_calls"] += 1
+        schema = [{"name": "value", "type": "float"}, {"name": "event_timestamp", "type": "timestamp"}]
+        return aiohttp.web.json_response({"feature_views": [{"name": "table", "entities": ["id"], "schema": schema}]})
+
+    async def historical_features(request):
+        page, page_size = int(request.query["page"]), int(request.query["page_size"])
+        state["pages_served"].append(page)
+        if page in state["failing_pages"]:
+            status, remaining = state["failing_pages"][page]
+            if remaining:
+                state["failing_pages"][page] = (status, remaining - 1)
+                return aiohttp.web.Response(status=status)
+        history = state["history"]
+        if page == 1:
+            state["windows"].append((request.query.get("initial_date"), request.query.get("end_date")))
+        if "initial_date" in request.query and "event_timestamp" in history:
+            history = history[pd.to_datetime(history["event_timestamp"]) >= pd.Timestamp(request.query["initial_date"])]
+        if "end_date" in request.query and "event_timestamp" in history:
+            # inclusive, like a server comparing with <=
+            history = history[pd.to_datetime(history["event_timestamp"]) <= pd.Timestamp(request.query["end_date"])]
+        rows = history.iloc[(page - 1) * page_size : page * page_size]
+        total_pages = max(1, -(-len(history) // page_size))
+        return aiohttp.web.json_response(
+            {"data": rows.to_dict("records"), "pagination": {"page": page, "total_pages": total_pages}}
+        )
+
+    app = aiohttp.web.Application()
+    app.router.add_post("/{table}/push", push)
+    app.router.add_get("/{table}/historical-features", historical_features)
+    app.router.add_get("/list-feature-views", list_feature_views)
+    server = await aiohttp_server(app)
+    server.state = state
+    return server
+
+
+@pytest.fixture
+async def feature_store(feature_server):
+    async with FeatureStore(str(feature_server.make_url("")), retry_policy=RetryPolicy(base_delay=0)) as store:
+        yield store
+
+
+def make_history(rows: int, freq: str = "min") -> pd.DataFrame:
+    frame = make_frame(rows, freq)
+    return frame.assign(event_timestamp=frame["event_timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S"))
+
+
+def make_frame(rows: int, freq: str = "min") -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": range(rows),
+            "value": [float(i) for i in range(rows)],
+            "event_timestamp": pd.date_range("2023-01-01", periods=rows, freq=freq),
+        }
+    )
+
+
+async def test_ingest_sends_batches_concurrently(feature_server, feature_store):
+    report = await feature_store.ingest("table", make_frame(1000), batch_size=100, max_concurrent_batches=4)
+
+    assert report.ok
+    assert (report.ingested_rows, report.batches) == (1000, 10)
+    assert sorted(row["id"] for row in feature_server.state["rows"]) == list(range(1000))
+    assert 1 < feature_server.state["max_in_flight"] <= 4
+
+
+@pytest.mark.parametrize("max_concurrent_batches", [0, -1])
+async def test_ingest_rejects_no_concurrent_batches(feature_server, feature_store, max_concurrent_batches):
+    with pytest.raises(ValueError, match="max_concurrent_batches"):
+        await feature_store.ingest("table", make_frame(10), max_concurrent_batches=max_concurrent_batches)
+    assert not feature_server.state["rows"]
+
+
+async def test_ingest_reports_failed_batches(feature_server, feature_store):
+    feature_server.state["reject"] = {150, 420}
+    report = await feature_store.ingest("table", make_frame(500), batch_size=100)
+
+    assert [(batch.start, batch.stop) for batch in report.failed_batches] == [(100, 200), (400, 500)]
+    assert report.ingested_rows == 300
+    assert report.failed_rows == 200
+
+
+async def test_ingest_resumes_from_journal(feature_server, feature_store, tmp_path):
+    journal_path = tmp_path / "ingest.journal"
+    feature_server.state["reject"] = {150, 420}
+    first = await feature_store.ingest("table", make_frame(500), batch_size=100, journal=journal_path)
+    assert first.ingested_rows == 300
+
+    feature_server.state["reject"] = set()
+    feature_server.state["rows"].clear()
+    second = await feature_store.ingest("table", make_frame(500), batch_size=100, journal=journal_path)
+
+    assert second.ok
+    assert second.skipped_rows == 300
+    assert sorted(row["id"] for row in feature_server.state["rows"]) == list(range(100, 200)) + list(range(400, 500))
+    with IngestJournal(journal_path) as journal:
+        assert len(journal) == 5
+
+
+async def test_ingest_journal_rejects_batch_sizer(feature_server, feature_store, tmp_path):
+    journal_path = tmp_path / "ingest.journal"
+    feature_server.state["reject"] = {150}
+    await feature_store.ingest("table", make_frame(500), batch_size=100, journal=journal_path)
+
+    # a rerun with sizes picked at run time wouldn't match the committed batches
+    with pytest.raises(ValueError, match="BatchSizer"):
+        await feature_store.ingest("table", make_frame(500), batch_size=BatchSizer(), journal=journal_path)
+    with pytest.raises(ValueError, match="BatchSizer"):
+        await feature_store.ingest_stream("table", [make_frame(500)], batch_size=BatchSizer(), journal=journal_path)
+    assert len(feature_server.state["rows"]) == 400
+
+
+async def test_ingest_sends_only_changed_rows(feature_server, feature_store, tmp_path):
+    index_path = tmp_path / "rows.sqlite"
+    await feature_store.ingest("table", make_frame(300), batch_size=100, row_index=index_path)
+
+    snapshot = make_frame(320)
+    snapshot.loc[snapshot["id"] < 50, "value"] = -1.0
+    feature_server.state["rows"].clear()
+    report = await feature_store.ingest("table", snapshot, batch_size=100, row_index=index_path)
+
+    assert report.ingested_rows == 70
+    assert report.skipped_rows == 250
+    assert sorted(row["id"] for row in feature_server.state["rows"]) == list(range(50)) + list(range(300, 320))
+    with RowHashIndex(index_path) as index:
+        assert len(index) == 320
+        assert index.changed_rows("table", snapshot, ["id", "event_timestamp"]).empty
+
+
+async def test_ingest_validates_against_table_schema(feature_server, feature_store):
+    assert (await feature_store.ingest("table", make_frame(100), validate=True)).ingested_rows == 100
+
+    bad = make_frame(100).rename(columns={"value": "Value"}).assign(event_timestamp=None)
+    bad.loc[3, "id"] = None
+    with pytest.raises(IngestValidationError) as error:
+        await feature_store.ingest("table", bad, validate=True)
+
+    assert error.value.errors == [
+        "column names must be lowercase: Value",
+        "column id has 1 null values",
+        "column event_timestamp has 100 null values",
+    ]
+    assert len(feature_server.state["rows"]) == 100
+    assert feature_server.state["list_calls"] == 1
+
+
+def test_validate_frame_checks_dtypes():
+    schema = [{"name": "count", "type": "int"}, {"name": "event_timestamp", "type": "timestamp"}]
+    table = {"entities": ["id"], "schema": schema}
+    frame = pd.DataFrame({"id": [1, 2], "count": [1.5, 2.0], "event_timestamp": ["2023-01-01", "not a date"]})
+
+    assert validate_frame(frame, table) == [
+        "column count has dtype float64, expected int",
+        f"column event_timestamp has dtype {frame['event_timestamp'].dtype}, expected timestamp",
+    ]
+    assert validate_frame(frame.assign(count=[1.0, None], event_timestamp="2023-01-01"), table) == []
+
+
+async def test_feature_writer_buffers_rows(feature_server, feature_store):
+    async with FeatureWriter(feature_store, "table", max_rows=50, flush_interval=0.05, to="online") as writer:
+        for row in make_frame(120).to_dict("records"):
+            await writer.write(row)
+        await asyncio.sleep(0.1)
+        assert len(feature_server.state["rows"]) == 120
+        await writer.write_frame(make_frame(130).iloc[120:])
+
+    assert writer.ingested_rows == 130
+    assert sorted(row["id"] for row in feature_server.state["rows"]) == list(range(130))
+    assert set(feature_server.state["targets"]) == {"online"}
+    assert len(feature_server.state["targets"]) < 10
+
+
+async def test_ingest_sizes_batches_by_payload(feature_server, feature_store):
+    narrow = make_frame(2000)
+    wide = narrow.assign(**{f"text_{i}": "x" * 50 for i in range(10)})
+
+    await feature_store.ingest("narrow", narrow, batch_size=BatchSizer(target_bytes=20000, max_rows=1000))
+    narrow_batches = len(feature_server.state["batch_bytes"])
+    feature_server.state["batch_bytes"].clear()
+    await feature_store.ingest("wide", wide, batch_size=BatchSizer(target_bytes=20000, max_rows=1000))
+
+    assert len(feature_server.state["batch_bytes"]) > 3 * narrow_batches
+    assert all(size <= 1.2 * 20000 for size in feature_server.state["batch_bytes"])
+    assert len(feature_server.state["rows"]) == 4000
+
+
+def test_batch_sizer_tunes_target_from_latency():
+    sizer = BatchSizer(target_bytes=100000, target_latency=1.0, min_bytes=1000, max_bytes=1000000)
+    sizer.observe(rows=100, nbytes=100000, latency=0.25)
+    assert sizer.target_bytes > 100000
+    grown = sizer.target_bytes
+    sizer.observe(rows=100, nbytes=100000, latency=4.0)
+    assert sizer.target_bytes < grown
+    assert sizer.batch_rows() == sizer.target_bytes // 1000
+
+
+@pytest.mark.parametrize("payload_format", ["arrow", "parquet"])
+async def test_ingest_columnar_payloads(feature_server, feature_store, payload_format):
+    pytest.importorskip("pyarrow")
+    frame = make_frame(300)
+    report = await feature_store.ingest("table", frame, batch_size=100, payload_format=payload_format)
+
+    assert report.ok
+    content_type = ARROW_CONTENT_TYPE if payload_format == "arrow" else PARQUET_CONTENT_TYPE
+    assert set(feature_server.state["formats"]) == {content_type}
+    received = pd.DataFrame(feature_server.state["rows"]).sort_values("id", ignore_index=True)
+    pd.testing.assert_frame_equal(received, frame, check_dtype=False)
+
+
+async def test_ingest_encodes_batches_in_process_pool(feature_server, feature_store):
+    frame = make_frame(400)
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+        report = await feature_store.ingest("table", frame, batch_size=100, executor=executor)
+
+    assert report.ok
+    received = pd.DataFrame(feature_server.state["rows"]).sort_values("id", ignore_index=True)
+    pd.testing.assert_frame_equal(received[["id", "value"]], frame[["id", "value"]])
+
+
+async def test_ingest_falls_back_to_json(feature_server, feature_store):
+    pytest.importorskip("pyarrow")
+    feature_server.state["formats_supported"] = set()
+    report = await feature_store.ingest(
+        "table", make_frame(300), batch_size=100, payload_format="arrow", max_concurrent_batches=1
+    )
+
+    assert report.ok
+    assert feature_server.state["formats"] == ["application/json"] * 3
+    assert len(feature_server.state["rows"]) == 300
+
+
+async def test_ingest_keeps_the_format_of_a_missing_table(feature_server, feature_store):
+    pytest.importorskip("pyarrow")
+    feature_server.state["missing_tables"].add("table")
+    report = await feature_store.ingest(
+        "table", make_frame(200), batch_size=100, payload_format="arrow", max_concurrent_batches=1
+    )
+
+    assert report.failed_rows == 200
+    assert feature_store._unsupported_payload_formats == set()
+    assert len(feature_server.state["batch_bytes"]) == 2
+    assert feature_server.state["formats"] == []
+
+
+async def test_ingest_stream_from_iterators(feature_server, feature_store):
+    def chunks():
+        for start in range(0, 1000, 250):
+            yield make_frame(1000).iloc[start : start + 250].rename(columns={"value": "VALUE"})
+
+    async def async_chunks():
+        for chunk in chunks():
+            yield chunk
+
+    for source in (chunks(), async_chunks()):
+        feature_server.state["rows"].clear()
+        report = await feature_store.ingest_stream(
+            "table", source, renames={"VALUE": "value"}, all_columns=["id", "value"], batch_size=100
+        )
+        assert (report.ok, report.ingested_rows, report.batches) == (True, 1000, 12)
+        assert sorted(row["id"] for row in feature_server.state["rows"]) == list(range(1000))
+        assert set(feature_server.state["rows"][0]) == {"id", "value"}
+
+
+@pytest.mark.parametrize("file_name", ["data.csv", "data.parquet"])
+async def test_ingest_stream_from_files(feature_server, feature_store, tmp_path, file_name):
+    path = tmp_path / file_name
+    if file_name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+        make_frame(1000).to_parquet(path, row_group_size=300)
+    else:
+        make_frame(1000).to_csv(path, index=False)
+
+    report = await feature_store.ingest_stream("table", path, batch_size=100, chunk_rows=300)
+
+    assert report.ok
+    assert report.ingested_rows == 1000
+    assert report.failed_batches == []
+    assert sorted(row["id"] for row in feature_server.state["rows"]) == list(range(1000))
+
+
+async def test_get_training_features_assembles_pages(feature_server, feature_store):
+    frame = await feature_store.get_training_features("table")
+
+    assert sorted(feature_server.state["pages_served"]) == [1, 2, 3]
+    pd.testing.assert_frame_equal(frame, feature_server.state["history"])
+
+    typed = await feature_store.get_training_features("table", apply_schema=True)
+    assert isinstance(typed["event_timestamp"].dtype, pd.DatetimeTZDtype)
+    assert typed["value"].dtype == "float64"
+
+
+async def test_iter_training_features_yields_pages_in_order(feature_server, feature_store):
+    frames = [frame async for frame in feature_store.iter_training_features("table", prefetch=2, pages_per_frame=2)]
+
+    assert [len(frame) for frame in frames] == [200, 50]
+    pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), feature_server.state["history"])
+
+    feature_server.state["history"] = make_history(2000)
+    feature_server.state["pages_served"].clear()
+    async for frame in feature_store.iter_training_features("table", prefetch=3):
+        assert frame["id"].tolist() == list(range(100))
+        break
+    assert len(feature_server.state["pages_served"]) <= 4
+
+
+async def test_get_training_features_reads_from_cache(feature_server, tmp_path):
+    pytest.importorskip("pyarrow")
+    cache = FeatureCache(tmp_path)
+    async with FeatureStore(str(feature_server.make_url("")), cache=cache) as feature_store:
+        first = await feature_store.get_training_features("table", date_from="2023-01-01")
+        served = len(feature_server.state["pages_served"])
+        second = await feature_store.get_training_features("table", date_from="2023-01-01")
+        assert len(feature_server.state["pages_served"]) == served
+        await feature_store.get_training_features("table", date_from="2023-01-02")
+
+    pd.testing.assert_frame_equal(first, second)
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+
+
+async def test_get_training_features_fetches_missing_days(feature_server, tmp_path):
+    pytest.importorskip("pyarrow")
+    feature_server.state["history"] = make_history(40, freq="6h")
+    async with FeatureStore(str(feature_server.make_url("")), cache=FeatureCache(tmp_path)) as feature_store:
+        first = await feature_store.get_training_features(
+            "table", date_from="2023-01-02", date_to="2023-01-04", cache_by_day=True
+        )
+        extended = await feature_store.get_training_features(
+            "table", date_from="2023-01-01", date_to="2023-01-05", cache_by_day=True
+        )
+
+    assert feature_server.state["windows"] == [
+        ("2023-01-02", "2023-01-05"),
+        ("2023-01-01", "2023-01-02"),
+        ("2023-01-05", "2023-01-06"),
+    ]
+    assert first["id"].tolist() == list(range(4, 16))
+    assert extended["id"].tolist() == list(range(0, 20))
+
+
+async def test_get_training_features_by_day_requires_event_timestamp(feature_server, tmp_path):
+    pytest.importorskip("pyarrow")
+    feature_server.state["history"] = make_history(40, freq="6h").drop(columns="event_timestamp")
+    async with FeatureStore(str(feature_server.make_url("")), cache=FeatureCache(tmp_path)) as feature_store:
+        with pytest.raises(ValueError, match="event_timestamp"):
+            await feature_store.get_training_features(
+                "table", date_from="2023-01-02", date_to="2023-01-04", cache_by_day=True
+            )
+    assert not list(tmp_path.iterdir())
+
+
+async def test_get_training_features_page_size(feature_server, feature_store):
+    frame = await feature_store.get_training_features("table", page_size=50)
+
+    assert sorted(feature_server.state["pages_served"]) == [1, 2, 3, 4, 5]
+    pd.testing.assert_frame_equal(frame, feature_server.state["history"])
+
+
+async def test_get_training_features_keeps_pages_for_resume(feature_server, tmp_path):
+    pytest.importorskip("pyarrow")
+    # page 2 fails twice then succeeds, page 3 keeps failing with a non transient status
+    feature_server.state["failing_pages"] = {2: (503, 2), 3: (400, 100)}
+    url = str(feature_server.make_url(""))
+    async with FeatureStore(url, retry_policy=RetryPolicy(max_attempts=1, base_delay=0)) as feature_store:
+        with pytest.raises(IncompletePullError) as error:
+            await feature_store.get_training_features("table")
+        assert error.value.pull.fetched_pages == [1, 2]
+        assert list(error.value.pull.failed_pages) == [3]
+
+        pull = await feature_store.pull_training_features("table", directory=tmp_path)
+        assert pull.missing_pages == [3]
+
+    feature_server.state["failing_pages"] = {}
+    async with FeatureStore(url) as feature_store:
+        pull = await feature_store.resume_training_features(TrainingFeaturesPull.load(tmp_path))
+
+    assert pull.complete
+    pd.testing.assert_frame_equal(pull.to_frame(), feature_server.state["history"])
+
+
+async def test_pull_directory_reused_for_another_request(feature_server, feature_store, tmp_path):
+    pytest.importorskip("pyarrow")
+    await feature_store.pull_training_features("table", directory=tmp_path)
+    await feature_store.pull_training_features("table", date_from="2023-01-01T04:00:00", directory=tmp_path)
+
+    pull = TrainingFeaturesPull.load(tmp_path)
+    assert pull.fetched_pages == [1]
+    assert pull.to_frame()["id"].tolist() == list(range(240, 250))
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+async def test_spill_training_features(feature_server, feature_store, tmp_path, file_format):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / ("pages" if file_format == "parquet" else "features.arrow")
+    dataset = await feature_store.spill_training_features("table", path, file_format=file_format, apply_schema=True)
+
+    assert len(dataset.files) == (3 if file_format == "parquet" else 1)
+    frame = dataset.to_table().to_pandas()
+    assert frame["id"].tolist() == list(range(250))
+    assert isinstance(frame["event_timestamp"].dtype, pd.DatetimeTZDtype)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+async def test_spill_training_features_promotes_page_types(feature_server, feature_store, tmp_path, file_format):
+    pytest.importorskip("pyarrow")
+    history = feature_server.state["history"]
+    # all null in the first page, then floats
+    feature_server.state["history"] = history.assign(sparse=pd.Series([None] * 100 + [0.5] * 150, dtype=object))
+    path = tmp_path / ("pages" if file_format == "parquet" else "features.arrow")
+    dataset = await feature_store.spill_training_features("table", path, file_format=file_format)
+
+    frame = dataset.to_table().to_pandas()
+    assert frame["sparse"].isna().sum() == 100
+    assert frame["sparse"].dropna().tolist() == [0.5] * 150
+    assert not os.path.exists(f"{path}.pages")
+
+
+async def test_spill_training_features_maps_the_arrow_file(feature_server, feature_store, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    feature_server.state["history"] = make_history(20000)
+    dataset = await feature_store.spill_training_features(
+        "table", tmp_path / "features.arrow", file_format="arrow", page_size=5000
+    )
+
+    allocated = pa.total_allocated_bytes()
+    table = dataset.to_table()
+    # the columns point into the mapped file instead of buffers allocated on the heap
+    assert pa.total_allocated_bytes() - allocated < table.nbytes / 10
+
+
+def test_pull_dataset_rejects_mismatched_pages(tmp_path):
+    pytest.importorskip("pyarrow")
+    pull = TrainingFeaturesPull("endpoint", {}, 100, tmp_path)
+    pull.set_total_pages(2)
+    pull.add_page(1, make_frame(2))
+    pull.add_page(2, make_frame(2).assign(extra=1))
+    with pytest.raises(ValueError, match="extra"):
+        pull.dataset()
@@ -0,0 +1,15 @@
+import jwt
+
+from elemeno_ai_sdk.ml.features.utils import get_feature_server_url_from_api_key, parse_user_account
+
+
+def test_parse_user_account_replaces_punctuation():
+    assert parse_user_account("john.doe@elemeno_ai") == "john-doe-elemeno-ai"
+
+
+def test_feature_server_url_is_resolved_once_per_key():
+    api_key = jwt.encode({"account": "acme.corp"}, "secret", algorithm="HS256")
+    get_feature_server_url_from_api_key.cache_clear()
+    for _ in range(3):
+        assert get_feature_server_url_from_api_key(api_key) == "https://feature-server-acme-corp.app.elemeno.ai"
+    assert get_feature_server_url_from_api_key.cache_info().hits == 2
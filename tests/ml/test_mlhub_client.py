@@ -0,0 +1,326 @@
+import asyncio
+import time
+
+import aiohttp
+import numpy as np
+import pandas as pd
+import pytest
+from tenacity import RetryCallState
+
+from elemeno_ai_sdk.ml.mlhub_client import MLHubRemote
+from elemeno_ai_sdk.ml.remote import circuit_breaker, rate_limit
+from elemeno_ai_sdk.ml.remote.circuit_breaker import CircuitBreaker, CircuitOpenError
+from elemeno_ai_sdk.ml.remote.compression import Compression
+from elemeno_ai_sdk.ml.remote.concurrency import AdaptiveConcurrency
+from elemeno_ai_sdk.ml.remote.metrics import RequestMetrics
+from elemeno_ai_sdk.ml.remote.rate_limit import TokenBucket, configure_rate_limit
+from elemeno_ai_sdk.ml.remote.retry import MLHubRequestError, RetryPolicy, parse_retry_after
+from elemeno_ai_sdk.ml.remote.serializers import JSONSerializer, orjson
+from elemeno_ai_sdk.ml.remote.session import MLHubSession
+from elemeno_ai_sdk.ml.remote.singleflight import SingleFlight
+
+
+@pytest.fixture
+def api_key(monkeypatch):
+    monkeypatch.setenv("MLHUB_API_KEY", "test-key")
+
+
+@pytest.fixture(autouse=True)
+def circuit_breakers(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+
+@pytest.fixture
+async def server(aiohttp_server):
+    peers = []
+
+    async def handle_get(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        assert request.headers["x-api-key"] == "test-key"
+        return aiohttp.web.json_response({"result": "ok"})
+
+    async def handle_post(request):
+        return aiohttp.web.json_response(await request.json())
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/resource", handle_get)
+    app.router.add_post("/resource", handle_post)
+    server = await aiohttp_server(app)
+    server.peers = peers
+    return server
+
+
+async def test_session_is_reused_across_requests(api_key, server):
+    async with MLHubRemote() as client:
+        for _ in range(3):
+            assert await client.get(str(server.make_url("/resource"))) == {"result": "ok"}
+        assert len(set(server.peers)) == 1
+    assert client.session.closed
+
+
+async def test_session_is_shared_between_clients(api_key, server):
+    async with MLHubSession(limit=1) as session:
+        first, second = MLHubRemote(session=session), MLHubRemote(session=session)
+        await first.get(str(server.make_url("/resource")))
+        response = await second.post(str(server.make_url("/resource")), body={"a": 1})
+        assert response == '{"a": 1}'
+        assert await first.session.get() is await second.session.get()
+
+
+def test_sessions_are_closed_with_their_event_loop(api_key):
+    client = MLHubRemote()
+    sessions = [asyncio.run(client.session.get()) for _ in range(2)]
+    assert sessions[0] is not sessions[1]
+    assert all(session.closed for session in sessions)
+    assert client.session.closed
+
+
+@pytest.fixture
+async def flaky_server(aiohttp_server):
+    calls = {"GET": 0, "POST": 0}
+
+    async def handle(request):
+        calls[request.method] += 1
+        status = int(request.query.get("status", 200))
+        if calls[request.method] <= int(request.query.get("failures", 0)):
+            return aiohttp.web.Response(status=status, headers={"Retry-After": "0"})
+        return aiohttp.web.json_response({"result": "ok"})
+
+    app = aiohttp.web.Application()
+    app.router.add_route("*", "/flaky", handle)
+    server = await aiohttp_server(app)
+    server.calls = calls
+    return server
+
+
+async def test_transient_statuses_are_retried(api_key, flaky_server):
+    async with MLHubRemote(retry_policy=RetryPolicy(base_delay=0)) as client:
+        url = str(flaky_server.make_url("/flaky"))
+        assert await client.get(url, params={"status": 503, "failures": 2}) == {"result": "ok"}
+    assert flaky_server.calls["GET"] == 3
+
+
+async def test_client_errors_are_not_retried(api_key, flaky_server):
+    async with MLHubRemote(retry_policy=RetryPolicy(base_delay=0)) as client:
+        url = str(flaky_server.make_url("/flaky"))
+        assert await client.get(url, params={"status": 400, "failures": 1}) is None
+        assert await client.post(f"{url}?status=500&failures=1", body={}) is None
+    assert flaky_server.calls == {"GET": 1, "POST": 1}
+
+
+async def test_undecodable_responses_are_failures(api_key, aiohttp_server):
+    async def handle(request):
+        return aiohttp.web.Response(text="<html>proxy error</html>", content_type="text/html")
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/html", handle)
+    server = await aiohttp_server(app)
+    url = str(server.make_url("/html"))
+
+    async with MLHubRemote() as client:
+        assert await client.get(url) is None
+        with pytest.raises(MLHubRequestError, match="decode"):
+            await client.get(url, raise_errors=True)
+
+
+def test_retry_after_takes_precedence_over_backoff():
+    policy = RetryPolicy(base_delay=0, max_delay=10)
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    error = MLHubRequestError("throttled", status=429, retry_after=3.0)
+    state = RetryCallState(None, None, (), {})
+    state.set_exception((MLHubRequestError, error, None))
+    assert policy.wait(state) == 3.0
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker("host", failure_threshold=2, recovery_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    time.sleep(0.05)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+async def test_cancelled_probe_releases_the_circuit(api_key, aiohttp_server):
+    async def handle(request):
+        if "slow" in request.query:
+            await asyncio.sleep(1)
+        return aiohttp.web.json_response({"result": "ok"})
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/resource", handle)
+    server = await aiohttp_server(app)
+    url = str(server.make_url("/resource"))
+    breaker = circuit_breaker.configure_circuit_breaker(server.host, failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    async with MLHubRemote() as client:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get(url, params={"slow": 1}), 0.05)
+        assert breaker.state == "half_open"
+        assert await client.get(url) == {"result": "ok"}
+    assert breaker.state == "closed"
+
+
+async def test_single_flight_coalesces_identical_gets(api_key, server):
+    async with MLHubRemote(single_flight=SingleFlight()) as client:
+        url = str(server.make_url("/resource"))
+        same = [client.get(url, params={"key": "hot"}) for _ in range(5)]
+        responses = await asyncio.gather(*same, client.get(url, params={"key": "other"}))
+        assert all(response == {"result": "ok"} for response in responses)
+        assert len(server.peers) == 2
+        assert len(client.single_flight) == 0
+
+
+async def test_request_metrics_are_recorded(api_key, flaky_server):
+    metrics = RequestMetrics()
+    async with MLHubRemote(retry_policy=RetryPolicy(base_delay=0), metrics=metrics) as client:
+        url = str(flaky_server.make_url("/flaky"))
+        await client.get(url, params={"status": 503, "failures": 1})
+        await client.post(url, body={"a": 1})
+
+    snapshot = metrics.snapshot()
+    get_metrics = snapshot["endpoints"][f"GET {url}"]
+    assert get_metrics["requests"] == 2
+    assert get_metrics["retries"] == 1
+    assert get_metrics["statuses"] == {503: 1, 200: 1}
+    assert snapshot["endpoints"][f"POST {url}"]["bytes_sent"] == len(client.serializer.dumps({"a": 1}))
+    assert snapshot["in_flight"] == 0
+
+    exported = metrics.to_prometheus()
+    assert f'mlhub_requests_total{{method="GET",endpoint="{url}",status="503"}} 1' in exported
+    assert f'mlhub_request_duration_seconds_count{{method="POST",endpoint="{url}"}} 1' in exported
+
+
+def test_token_bucket_reserves_in_arrival_order():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+    # larger than the capacity, waits for the bucket to be full again
+    assert bucket.reserve(5) == pytest.approx(0.4, abs=0.01)
+
+
+async def test_requests_wait_for_the_host_rate_limit(api_key, server, monkeypatch):
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+    configure_rate_limit(server.host, requests_per_second=20, burst=0.05)
+    async with MLHubRemote() as client:
+        start = time.monotonic()
+        await asyncio.gather(*[client.get(str(server.make_url("/resource"))) for _ in range(5)])
+        assert time.monotonic() - start >= 0.2
+
+
+@pytest.mark.parametrize(
+    "use_orjson", [False, pytest.param(True, marks=pytest.mark.skipif(orjson is None, reason="orjson"))]
+)
+def test_serializer_encodes_dataframe_values(use_orjson):
+    serializer = JSONSerializer(use_orjson=use_orjson)
+    frame = pd.DataFrame(
+        {
+            "id": np.array([1, 2], dtype="int64"),
+            "event_timestamp": [pd.Timestamp("2023-01-01 10:00"), pd.NaT],
+        }
+    )
+    encoded = serializer.dumps({"df": frame.to_dict("list"), "scalar": np.float32(0.5)})
+    assert serializer.loads(encoded) == {
+        "df": {"id": [1, 2], "event_timestamp": ["2023-01-01T10:00:00", None]},
+        "scalar": 0.5,
+    }
+    assert serializer.loads(b'{"value": NaN}')["value"] != serializer.loads(b'{"value": NaN}')["value"]
+
+
+@pytest.mark.parametrize(
+    "use_orjson", [False, pytest.param(True, marks=pytest.mark.skipif(orjson is None, reason="orjson"))]
+)
+def test_serializer_encodes_nullable_dtypes_and_datetime_arrays(use_orjson):
+    serializer = JSONSerializer(use_orjson=use_orjson)
+    frame = pd.DataFrame({"id": [1, None], "flag": [True, None], "name": ["a", None]}).astype(
+        {"id": "Int64", "flag": "boolean", "name": "string"}
+    )
+    timestamps = np.array(["2023-01-01T10:00", "2023-01-01T10:30:00.5"], dtype="datetime64[ns]")
+    # tolist keeps pd.NA, like to_dict does before pandas 3
+    encoded = serializer.dumps({"df": {name: frame[name].tolist() for name in frame}, "timestamps": timestamps})
+    assert serializer.loads(encoded) == {
+        "df": {"id": [1, None], "flag": [True, None], "name": ["a", None]},
+        "timestamps": ["2023-01-01T10:00:00", "2023-01-01T10:30:00.500000"],
+    }
+
+
+@pytest.mark.parametrize(
+    "use_orjson", [False, pytest.param(True, marks=pytest.mark.skipif(orjson is None, reason="orjson"))]
+)
+def test_serializer_encodes_non_finite_floats_as_null(use_orjson):
+    serializer = JSONSerializer(use_orjson=use_orjson)
+    frame = pd.DataFrame({"value": [1.5, np.nan, np.inf, -np.inf]})
+    encoded = serializer.dumps(
+        {
+            "df": frame.to_dict("list"),
+            "scalars": (float("nan"), np.float32("inf")),
+            "array": np.array([np.nan, 2.0]),
+        }
+    )
+    assert b"NaN" not in encoded and b"Infinity" not in encoded
+    assert serializer.loads(encoded) == {
+        "df": {"value": [1.5, None, None, None]},
+        "scalars": [None, None],
+        "array": [None, 2.0],
+    }
+
+
+async def test_warm_up_opens_a_reusable_connection(api_key, server):
+    async with MLHubRemote() as client:
+        await client.warm_up(str(server.make_url("/resource")))
+        await client.get(str(server.make_url("/resource")))
+    assert len(server.peers) == 2
+    assert len(set(server.peers)) == 1
+
+
+async def test_large_bodies_are_compressed(api_key, aiohttp_server):
+    encodings = []
+
+    async def handle(request):
+        encodings.append(request.headers.get("Content-Encoding"))
+        response = aiohttp.web.json_response(await request.json())
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response.enable_compression()
+        return response
+
+    app = aiohttp.web.Application()
+    app.router.add_route("*", "/echo", handle)
+    server = await aiohttp_server(app)
+    url = str(server.make_url("/echo"))
+    metrics = RequestMetrics()
+
+    async with MLHubRemote(compression=Compression(threshold=100), metrics=metrics) as client:
+        body = {"df": {"value": [0.5] * 1000}}
+        assert await client.post(url, body=body) == '{"df": {"value": [' + ", ".join(["0.5"] * 1000) + "]}}"
+        assert await client.post(url, body={"small": 1}) is not None
+
+    assert encodings == ["gzip", None]
+    sent = metrics.snapshot()["endpoints"][f"POST {url}"]["bytes_sent"]
+    assert sent < len(client.serializer.dumps(body))
+
+
+def test_adaptive_concurrency_grows_and_backs_off():
+    concurrency = AdaptiveConcurrency(initial_limit=2, max_limit=8)
+    for _ in range(40):
+        concurrency.observe(0.1)
+    assert concurrency.limit == 8
+
+    concurrency.observe(None, ok=False)
+    assert concurrency.limit == 4
+    # the requests in flight report the same congestion, they don't decrease it again
+    concurrency.observe(None, ok=False)
+    assert concurrency.limit == 4
+
+    for _ in range(4):
+        concurrency.observe(0.1)
+    concurrency.observe(1.0)
+    assert concurrency.limit == 2
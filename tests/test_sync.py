@@ -0,0 +1,83 @@
+import inspect
+
+import pandas as pd
+import pytest
+from aiohttp import web
+
+from elemeno_ai_sdk.ml.features.delta import RowHashIndex
+from elemeno_ai_sdk.ml.features.feature_table import FeatureTable as AsyncFeatureTable
+from elemeno_ai_sdk.sync import BackgroundLoop, FeatureStore, FeatureTable
+
+
+@pytest.fixture
+def background_loop():
+    background_loop = BackgroundLoop()
+    yield background_loop
+    background_loop.stop()
+
+
+@pytest.fixture
+def remote_server(monkeypatch, background_loop):
+    monkeypatch.setenv("MLHUB_API_KEY", "test-key")
+    peers = []
+    pushed = []
+
+    async def handle_push(request):
+        pushed.extend((await request.json())["df"]["id"])
+        return web.json_response({"status": "ok"})
+
+    async def handle_list(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        return web.json_response({"feature_views": [{"name": "table"}]})
+
+    async def handle_history(request):
+        page = int(request.query["page"])
+        return web.json_response({"data": [{"id": page}], "pagination": {"total_pages": 3}})
+
+    async def start():
+        app = web.Application()
+        app.router.add_get("/list-feature-views", handle_list)
+        app.router.add_get("/{table}/historical-features", handle_history)
+        app.router.add_post("/{table}/push", handle_push)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, runner.addresses[0][1]
+
+    runner, port = background_loop.run(start())
+    yield f"http://127.0.0.1:{port}", peers, pushed
+    background_loop.run(runner.cleanup())
+
+
+def test_blocking_calls_reuse_the_background_loop(background_loop, remote_server):
+    url, peers, _ = remote_server
+    with FeatureTable(remote_server=url, background_loop=background_loop) as feature_table:
+        for _ in range(3):
+            assert feature_table.list() == [{"name": "table"}]
+    assert len(set(peers)) == 1
+
+
+def test_async_generators_become_generators(background_loop, remote_server):
+    url, _, _ = remote_server
+    with FeatureStore(remote_server=url, background_loop=background_loop) as feature_store:
+        pages = feature_store.iter_training_features("table")
+        assert [page["id"].tolist() for page in pages] == [[1], [2], [3]]
+
+
+def test_ingest_with_a_row_index_built_on_the_caller_thread(background_loop, remote_server, tmp_path):
+    url, _, pushed = remote_server
+    frame = pd.DataFrame({"id": range(10), "value": [float(i) for i in range(10)]})
+    with RowHashIndex(tmp_path / "rows.sqlite") as row_index:
+        with FeatureStore(remote_server=url, background_loop=background_loop) as feature_store:
+            report = feature_store.ingest("table", frame, batch_size=5, row_index=row_index, row_keys=["id"])
+            assert report.ok
+            assert feature_store.ingest("table", frame, row_index=row_index, row_keys=["id"]).skipped_rows == 10
+        assert len(row_index) == 10
+    assert pushed == list(range(10))
+
+
+def test_blocking_methods_keep_the_async_signature(background_loop):
+    feature_table = FeatureTable(remote_server="http://localhost", background_loop=background_loop)
+    assert inspect.signature(feature_table.delete) == inspect.signature(AsyncFeatureTable("http://localhost").delete)
+    assert feature_table.client.session is not None